@@ -4,56 +4,41 @@ Handles parsing and validating command-line arguments.
 """
 
 import argparse
+import functools
 import sys
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 from src.config.settings import settings
 
 
-def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
+# Server types recognised when given to --servers by mistake
+_KNOWN_TYPES = frozenset(("build", "router", "compute", "dev"))
+
+# Global options that consume the following token as their value
+_GLOBAL_VALUE_OPTIONS = ("--config", "--log-level", "--log-file", "--key")
+
+# Result of parse_arguments(["shell"]), so a bare "shell" can skip argparse and
+# still apply the same defaults (e.g. --parallel's store_true default of False)
+BARE_SHELL_ARGS: Dict[str, Any] = {
+    "config": None,
+    "log_level": None,
+    "log_file": None,
+    "key": None,
+    "operation": "shell",
+    "parallel": False,
+    "max_workers": None,
+    "timeout": None,
+    "retries": None,
+}
+
+
+def _build_common_args() -> argparse.ArgumentParser:
     """
-    Parse command-line arguments.
+    Build the parent parser with arguments shared by every subcommand.
     
-    Args:
-        args: Command-line arguments (sys.argv[1:] if None)
-        
     Returns:
-        Dict: Parsed arguments as a dictionary
+        argparse.ArgumentParser: Parent parser for subcommands
     """
-    if args is None:
-        args = sys.argv[1:]
-    
-    parser = argparse.ArgumentParser(
-        description="HB Deploy - Deployment tool for HB servers",
-        formatter_class=argparse.RawTextHelpFormatter
-    )
-    
-    # Add global arguments
-    parser.add_argument(
-        "--config", 
-        help="Path to a configuration file"
-    )
-    parser.add_argument(
-        "--log-level", 
-        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
-        help="Set the logging level"
-    )
-    parser.add_argument(
-        "--log-file", 
-        help="Path to the log file"
-    )
-    parser.add_argument(
-        "--key",
-        help="SSH key to use"
-    )
-    
-    # Create subparsers for different operations
-    subparsers = parser.add_subparsers(
-        dest="operation",
-        help="Operation to perform"
-    )
-    
-    # Add common arguments that can be used with any subcommand
     common_args = argparse.ArgumentParser(add_help=False)
     common_args.add_argument(
         "--parallel",
@@ -75,8 +60,11 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         type=int,
         help="Number of retries for operations"
     )
-    
-    # download_release operation
+    return common_args
+
+
+def _build_download(subparsers, common_args) -> None:
+    """Register the download_release operation."""
     download_parser = subparsers.add_parser(
         "download",
         parents=[common_args],
@@ -90,8 +78,10 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         "--type",
         help="Server type to download to (e.g., router, compute)"
     )
-    
-    # build_release operation
+
+
+def _build_build(subparsers, common_args) -> None:
+    """Register the build_release operation."""
     build_parser = subparsers.add_parser(
         "build",
         parents=[common_args],
@@ -101,8 +91,10 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         "--servers",
         help="Comma-separated list of build server IDs"
     )
-    
-    # start_release operation
+
+
+def _build_start(subparsers, common_args) -> None:
+    """Register the start_release operation."""
     start_parser = subparsers.add_parser(
         "start",
         parents=[common_args],
@@ -116,8 +108,10 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         "--type",
         help="Server type to start (e.g., router, compute)"
     )
-    
-    # shutdown_release operation
+
+
+def _build_shutdown(subparsers, common_args) -> None:
+    """Register the shutdown_release operation."""
     shutdown_parser = subparsers.add_parser(
         "shutdown",
         parents=[common_args],
@@ -131,8 +125,10 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         "--type",
         help="Server type to shut down (e.g., router, compute)"
     )
-    
-    # update_config operation
+
+
+def _build_update_config(subparsers, common_args) -> None:
+    """Register the update_config operation."""
     update_parser = subparsers.add_parser(
         "update-config",
         parents=[common_args],
@@ -146,8 +142,10 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         "--type",
         help="Server type to update (e.g., router, compute)"
     )
-    
-    # run command operation
+
+
+def _build_run(subparsers, common_args) -> None:
+    """Register the run command operation."""
     run_parser = subparsers.add_parser(
         "run",
         parents=[common_args],
@@ -166,13 +164,132 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
         "--type",
         help="Server type to run on (e.g., router, compute, build)"
     )
-    
-    # shell operation for interactive shell
-    shell_parser = subparsers.add_parser(
+
+
+def _build_shell(subparsers, common_args) -> None:
+    """Register the shell operation for the interactive shell."""
+    subparsers.add_parser(
         "shell",
         parents=[common_args],
         help="Start an interactive shell"
     )
+
+
+# Subparser builders keyed by operation name, in help display order
+PARSER_BUILDERS = {
+    "download": _build_download,
+    "build": _build_build,
+    "start": _build_start,
+    "shutdown": _build_shutdown,
+    "update-config": _build_update_config,
+    "run": _build_run,
+    "shell": _build_shell,
+}
+
+
+def _detect_operation(args: List[str]) -> Optional[str]:
+    """
+    Find the operation name in the raw arguments without parsing them.
+    
+    Args:
+        args: Command-line arguments
+        
+    Returns:
+        Optional[str]: The first positional argument, or None if there is none
+                       or top-level help was requested before it.
+    """
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg in ("-h", "--help"):
+            return None
+        if arg.startswith("-"):
+            # Options given as "--key value" consume the next token
+            skip_next = arg in _GLOBAL_VALUE_OPTIONS
+            continue
+        return arg
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser(operations: Tuple[str, ...]) -> argparse.ArgumentParser:
+    """
+    Build the argument parser with subparsers for the given operations.
+    Parsers are cached, so repeated parses reuse the same instance.
+    
+    Args:
+        operations: Names of the operations to register, in PARSER_BUILDERS order
+        
+    Returns:
+        argparse.ArgumentParser: The configured parser
+    """
+    parser = argparse.ArgumentParser(
+        description="HB Deploy - Deployment tool for HB servers",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    
+    # Add global arguments
+    parser.add_argument(
+        "--config", 
+        help="Path to a configuration file"
+    )
+    parser.add_argument(
+        "--log-level", 
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="Set the logging level"
+    )
+    parser.add_argument(
+        "--log-file", 
+        help="Path to the log file"
+    )
+    parser.add_argument(
+        "--key",
+        help="SSH key to use"
+    )
+    
+    # Create subparsers for different operations
+    subparsers = parser.add_subparsers(
+        dest="operation",
+        help="Operation to perform"
+    )
+    
+    # Add common arguments that can be used with any subcommand
+    common_args = _build_common_args()
+    
+    for operation in operations:
+        PARSER_BUILDERS[operation](subparsers, common_args)
+    
+    return parser
+
+
+def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Parse command-line arguments.
+    
+    Only the subparser for the requested operation is built; all of them are
+    built when no known operation is given so that help and errors list every choice.
+    
+    Args:
+        args: Command-line arguments (sys.argv[1:] if None)
+        
+    Returns:
+        Dict: Parsed arguments as a dictionary
+    """
+    if args is None:
+        args = sys.argv[1:]
+    
+    # Only build the subparser that will actually be dispatched
+    operation = _detect_operation(args)
+    if operation in PARSER_BUILDERS:
+        operations = (operation,)
+    elif operation is not None or any(a in ("-h", "--help") for a in args):
+        operations = tuple(PARSER_BUILDERS)
+    else:
+        operations = ()
+    
+    parser = _build_parser(operations)
     
     # Parse the arguments
     parsed_args = parser.parse_args(args)
@@ -184,16 +301,15 @@ def parse_arguments(args: Optional[List[str]] = None) -> Dict[str, Any]:
     if args_dict.get("servers"):
         # Check if the server argument is possibly a type
         # This handles the case where someone does --servers compute instead of --type compute
-        server_types = ["build", "router", "compute", "dev"]
-        if args_dict["servers"] in server_types and not args_dict.get("type"):
+        if args_dict["servers"] in _KNOWN_TYPES and not args_dict.get("type"):
             # This is likely a server type provided to --servers by mistake
             args_dict["type"] = args_dict["servers"]
             args_dict["servers"] = None
         else:
-            # Process as normal server IDs
-            args_dict["servers"] = [
-                s.strip() for s in args_dict["servers"].split(",") if s.strip()
-            ]
+            # Process as normal server IDs; a set makes later ID filtering O(1) per server
+            args_dict["servers"] = frozenset(
+                s for s in map(str.strip, args_dict["servers"].split(",")) if s
+            )
     
     return args_dict
 
@@ -0,0 +1,164 @@
+"""
+Shell completion module.
+Provides tab completion for the interactive shell.
+"""
+
+import shlex
+import bisect
+from typing import Dict, List, Tuple
+
+from prompt_toolkit.completion import Completer, Completion
+
+from src.config.servers import Server
+
+
+def _prefix_matches(candidates: Tuple[str, ...], order: Dict[str, int], prefix: str) -> List[str]:
+    """
+    Find the candidates that start with a prefix.
+    
+    Args:
+        candidates: Sorted candidate strings
+        order: Position of each candidate in its declared order
+        prefix: The prefix to match
+        
+    Returns:
+        List[str]: Matching candidates, in declared order
+    """
+    matches = []
+    for i in range(bisect.bisect_left(candidates, prefix), len(candidates)):
+        candidate = candidates[i]
+        if not candidate.startswith(prefix):
+            break
+        matches.append(candidate)
+    matches.sort(key=order.__getitem__)
+    return matches
+
+
+def _index(values: List[str]) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    """
+    Build the sorted copy and declared-order positions used by _prefix_matches.
+    
+    Args:
+        values: Candidate strings in declared order
+        
+    Returns:
+        Tuple: The sorted candidates, and each candidate's first position
+    """
+    order = {}
+    for i, value in enumerate(values):
+        order.setdefault(value, i)
+    return tuple(sorted(order)), order
+
+
+class HBCompleter(Completer):
+    """Custom completer for HB shell."""
+    
+    def __init__(self, servers: List[Server]):
+        """
+        Initialize the completer.
+        
+        Args:
+            servers: List of server configurations
+        """
+        self.servers = servers
+        self.commands = [
+            "download", "build", "start", "shutdown", "update-config", "run", 
+            "help", "exit", "quit", "servers", "parallel"
+        ]
+        self.server_ids = [s.id for s in servers]
+        self.server_types = list(dict.fromkeys(s.type for s in servers))
+        
+        # Create a mapping of command to subcommands/arguments
+        self.command_args = {
+            "download": ["--servers", "--type"],
+            "build": ["--servers"],
+            "start": ["--servers", "--type"],
+            "shutdown": ["--servers", "--type"],
+            "update-config": ["--servers", "--type"],
+            "run": ["--servers", "--type"],
+            "parallel": ["on", "off"],
+            "help": self.commands,
+        }
+        
+        # Sorted copies so prefix lookups can bisect instead of scanning; matches
+        # are still offered in the declared order
+        self._commands_index = _index(self.commands)
+        
+        # Value candidates for flags, keyed by the flag preceding the word being completed
+        self._by_prev = {
+            "--servers": _index(self.server_ids),
+            "--type": _index(self.server_types),
+        }
+        
+        # Last (text, words) pair, reused while the input hasn't changed
+        self._last = ("", [])
+    
+    def _split_words(self, text: str) -> List[str]:
+        """
+        Split the input into words, avoiding shlex for unquoted input.
+        
+        Args:
+            text: The current input text
+            
+        Returns:
+            List[str]: The words in the input
+        """
+        if text == self._last[0]:
+            return list(self._last[1])
+        
+        if '"' not in text and "'" not in text and "\\" not in text:
+            words = text.split()
+        else:
+            try:
+                words = shlex.split(text)
+            except ValueError:
+                # Unbalanced quotes while the user is still typing
+                words = text.split()
+        
+        self._last = (text, words)
+        return list(words)
+    
+    def get_completions(self, document, complete_event):
+        """
+        Get completions for the current document.
+        
+        Args:
+            document: The current input document
+            complete_event: The completion event
+            
+        Yields:
+            Completion: Potential completions
+        """
+        text = document.text
+        
+        # Split the input into words
+        words = self._split_words(text)
+        
+        # Find the word being completed
+        if not text or text[-1].isspace():
+            # No word is being completed, add a new empty word
+            words.append("")
+        
+        # Define the current word and the word before it
+        word_index = len(words) - 1
+        current_word = words[word_index]
+        prev_word = words[word_index - 1] if word_index > 0 else ""
+        
+        if word_index == 0:
+            # Completing the first word (command)
+            candidates = _prefix_matches(*self._commands_index, current_word)
+        else:
+            index = self._by_prev.get(prev_word)
+            if index is not None:
+                # The previous word is a flag that expects a value
+                candidates = _prefix_matches(*index, current_word)
+            else:
+                # Otherwise offer the arguments of the command
+                candidates = (
+                    arg for arg in self.command_args.get(words[0], ())
+                    if arg.startswith(current_word)
+                )
+        
+        start_position = -len(current_word)
+        for candidate in candidates:
+            yield Completion(candidate, start_position=start_position)
@@ -4,115 +4,71 @@ Provides an interactive shell interface with command history and completion.
 """
 
 import os
-import sys
 import shlex
-import readline
-import atexit
+import readline  # Enables line editing for input() prompts
+import importlib
+import functools
 from typing import Dict, List, Any, Callable, Optional, Tuple
 
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from prompt_toolkit.completion import Completer, Completion, WordCompleter
-
-from src.config.settings import settings
-from src.config.servers import load_servers
+from src.config.settings import settings, TRUTHY_VALUES, FALSY_VALUES
+from src.config.servers import (
+    Server, load_servers, build_server_index, get_servers_by_ids, get_servers_by_type
+)
 from src.ssh.key_manager import select_ssh_key, get_ssh_command_base
-from src.utils.logger import logger
-from src.operations.build import build_release_operation
-from src.operations.download import download_release_operation
-from src.operations.start import start_release_operation
-from src.operations.shutdown import shutdown_release_operation
-from src.operations.update_config import update_config_operation
-from src.operations.run_command import run_command_operation
+from src.utils.logger import logger, setup_logging
+
+
+# Operations by shell command, as (module in src.operations, function name, server type
+# selected when no --servers are given). Functions are imported on first use so commands
+# that never run them don't pay for the import.
+OPERATIONS = {
+    "download": ("download", "download_release_operation", None),
+    "build": ("build", "build_release_operation", "build"),
+    "start": ("start", "start_release_operation", None),
+    "shutdown": ("shutdown", "shutdown_release_operation", None),
+    "update-config": ("update_config", "update_config_operation", None),
+    "run": ("run_command", "run_command_operation", None),
+}
 
 
-class HBCompleter(Completer):
-    """Custom completer for HB shell."""
+# Help text for the shell, logged as a single message
+HELP_TEXT = """\
+  download [--servers ID1,ID2,...] [--type TYPE]
+      Download a release from a build server
+  build [--servers ID1,ID2,...]
+      Build a release on build servers
+  start [--servers ID1,ID2,...] [--type TYPE]
+      Start a release on router and compute servers
+  shutdown [--servers ID1,ID2,...] [--type TYPE]
+      Terminate QEMU processes on servers
+  update-config [--servers ID1,ID2,...] [--type TYPE]
+      Update configuration on servers
+  run [--servers ID1,ID2,...] [--type TYPE] COMMAND
+      Run a command on servers
+  servers
+      List available servers
+  parallel [on|off]
+      Enable or disable parallel execution
+  help
+      Show this help message
+  exit, quit
+      Exit the shell"""
+
+
+@functools.lru_cache(maxsize=None)
+def get_operation(command: str) -> Callable:
+    """
+    Import and return the operation function for a shell command.
     
-    def __init__(self, servers: List[Dict[str, Any]]):
-        """
-        Initialize the completer.
-        
-        Args:
-            servers: List of server configurations
-        """
-        self.servers = servers
-        self.commands = [
-            "download", "build", "start", "shutdown", "update-config", "run", 
-            "help", "exit", "quit", "servers", "parallel"
-        ]
-        self.server_ids = [s["id"] for s in servers]
-        self.server_types = list(set(s["type"] for s in servers))
-        
-        # Create a mapping of command to subcommands/arguments
-        self.command_args = {
-            "download": ["--servers", "--type"],
-            "build": ["--servers"],
-            "start": ["--servers", "--type"],
-            "shutdown": ["--servers", "--type"],
-            "update-config": ["--servers", "--type"],
-            "run": ["--servers", "--type"],
-            "parallel": ["on", "off"],
-            "help": self.commands,
-        }
-    
-    def get_completions(self, document, complete_event):
-        """
-        Get completions for the current document.
-        
-        Args:
-            document: The current input document
-            complete_event: The completion event
-            
-        Yields:
-            Completion: Potential completions
-        """
-        text = document.text
-        
-        # Split the input into words
-        words = shlex.split(text) if text else []
-        word_index = len(words)
-        
-        # Find the word being completed
-        if not text or text[-1].isspace():
-            # No word is being completed, add a new empty word
-            words.append("")
-            word_index = len(words) - 1
-        
-        # Define the current word and the words before it
-        current_word = words[word_index] if word_index < len(words) else ""
-        prev_word = words[word_index - 1] if word_index > 0 else ""
-        
-        # Check if we're completing the first word (command)
-        if word_index == 0:
-            for command in self.commands:
-                if command.startswith(current_word):
-                    yield Completion(command, start_position=-len(current_word))
-            return
-        
-        # Command-specific completions
-        command = words[0]
-        
-        # If the previous word is a flag that expects a server ID
-        if prev_word == "--servers":
-            for server_id in self.server_ids:
-                if server_id.startswith(current_word):
-                    yield Completion(server_id, start_position=-len(current_word))
-            return
-        
-        # If the previous word is a flag that expects a server type
-        if prev_word == "--type":
-            for server_type in self.server_types:
-                if server_type.startswith(current_word):
-                    yield Completion(server_type, start_position=-len(current_word))
-            return
+    Args:
+        command: The shell command name
         
-        # If we're completing the second word or later, offer appropriate arguments
-        if command in self.command_args:
-            for arg in self.command_args[command]:
-                if arg.startswith(current_word):
-                    yield Completion(arg, start_position=-len(current_word))
+    Returns:
+        Callable: The operation function
+    """
+    module_name, function_name, _ = OPERATIONS[command]
+    module = importlib.import_module(f"src.operations.{module_name}")
+    return getattr(module, function_name)
 
 
 def print_help(commands: Dict[str, Tuple[str, Callable]]) -> None:
@@ -123,29 +79,10 @@ def print_help(commands: Dict[str, Tuple[str, Callable]]) -> None:
         commands: Dictionary of commands
     """
     logger.info_highlight("Available commands:")
-    logger.info("  download [--servers ID1,ID2,...] [--type TYPE]")
-    logger.info("      Download a release from a build server")
-    logger.info("  build [--servers ID1,ID2,...]")
-    logger.info("      Build a release on build servers")
-    logger.info("  start [--servers ID1,ID2,...] [--type TYPE]")
-    logger.info("      Start a release on router and compute servers")
-    logger.info("  shutdown [--servers ID1,ID2,...] [--type TYPE]")
-    logger.info("      Terminate QEMU processes on servers")
-    logger.info("  update-config [--servers ID1,ID2,...] [--type TYPE]")
-    logger.info("      Update configuration on servers")
-    logger.info("  run [--servers ID1,ID2,...] [--type TYPE] COMMAND")
-    logger.info("      Run a command on servers")
-    logger.info("  servers")
-    logger.info("      List available servers")
-    logger.info("  parallel [on|off]")
-    logger.info("      Enable or disable parallel execution")
-    logger.info("  help")
-    logger.info("      Show this help message")
-    logger.info("  exit, quit")
-    logger.info("      Exit the shell")
-
-
-def list_servers(servers: List[Dict[str, Any]]) -> None:
+    logger.info(HELP_TEXT)
+
+
+def list_servers(servers: List[Server]) -> None:
     """
     List available servers.
     
@@ -153,8 +90,41 @@ def list_servers(servers: List[Dict[str, Any]]) -> None:
         servers: List of server configurations
     """
     logger.info_highlight("Available servers:")
-    for server in servers:
-        logger.info(f"  {server['id']}: {server['name']} ({server['type']}) - {server['ip']}")
+    logger.info("\n".join(
+        f"  {server.id}: {server.name} ({server.type}) - {server.ip}"
+        for server in servers
+    ))
+
+
+@functools.lru_cache(maxsize=128)
+def _split_csv(value: str) -> Tuple[str, ...]:
+    """
+    Split a comma-separated value into its non-empty, stripped items.
+    
+    Args:
+        value: The comma-separated value
+        
+    Returns:
+        Tuple[str, ...]: The items
+    """
+    return tuple(s.strip() for s in value.split(",") if s.strip())
+
+
+def _parse_servers(args_dict: Dict[str, Any], value: str) -> None:
+    """Store the value of a --servers flag."""
+    args_dict["servers"] = list(_split_csv(value))
+
+
+def _parse_type(args_dict: Dict[str, Any], value: str) -> None:
+    """Store the value of a --type flag."""
+    args_dict["type"] = value
+
+
+# Handlers for shell flags that take a value
+FLAG_HANDLERS = {
+    "--servers": _parse_servers,
+    "--type": _parse_type,
+}
 
 
 def parse_shell_command(command_line: str) -> Tuple[str, Dict[str, Any]]:
@@ -180,51 +150,111 @@ def parse_shell_command(command_line: str) -> Tuple[str, Dict[str, Any]]:
     try:
         # Split the command line into words
         words = shlex.split(command_line)
+    except ValueError as e:
+        logger.error(f"Error parsing command: {e}")
+        return "", args_dict
+    
+    if not words:
+        return "", args_dict
+    
+    # The first word is the command
+    cmd = words[0]
+    args_dict["operation"] = cmd
+    
+    # Process the remaining words as arguments
+    count = len(words)
+    i = 1
+    while i < count:
+        handler = FLAG_HANDLERS.get(words[i])
+        if handler is None:
+            # If it's not a recognized flag, assume it's the command for "run"
+            # or the value for "parallel"
+            if cmd in ("run", "parallel"):
+                args_dict["command"] = " ".join(words[i:])
+            break
         
-        if not words:
-            return "", args_dict
-        
-        # The first word is the command
-        cmd = words[0]
-        args_dict["operation"] = cmd
-        
-        # Process the remaining words as arguments
-        i = 1
-        while i < len(words):
-            arg = words[i]
-            
-            if arg == "--servers":
-                if i + 1 < len(words) and not words[i + 1].startswith("--"):
-                    args_dict["servers"] = [
-                        s.strip() for s in words[i + 1].split(",") if s.strip()
-                    ]
-                    i += 2
-                else:
-                    i += 1
-            elif arg == "--type":
-                if i + 1 < len(words) and not words[i + 1].startswith("--"):
-                    args_dict["type"] = words[i + 1]
-                    i += 2
-                else:
-                    i += 1
-            else:
-                # If it's not a recognized flag, assume it's the command for "run"
-                if cmd == "run":
-                    args_dict["command"] = " ".join(words[i:])
-                i = len(words)  # Exit the loop
+        if i + 1 < count and not words[i + 1].startswith("--"):
+            handler(args_dict, words[i + 1])
+            i += 2
+        else:
+            i += 1
+    
+    return cmd, args_dict
+
+
+def select_shell_servers(
+    command: str,
+    args: Dict[str, Any],
+    servers: List[Server],
+    by_type: Dict[str, List[Server]]
+) -> List[Server]:
+    """
+    Select the servers an operation command applies to.
+    
+    Args:
+        command: The operation command
+        args: The command arguments
+        servers: List of server configurations
+        by_type: Server index by type
         
-        return cmd, args_dict
+    Returns:
+        List[Server]: The selected servers
+    """
+    server_ids = args.get("servers")
+    if server_ids:
+        return get_servers_by_ids(servers, server_ids)
     
-    except Exception as e:
-        logger.error(f"Error parsing command: {e}")
-        return "", args_dict
+    # Operations with a fixed server type ignore --type
+    server_type = OPERATIONS[command][2] or args.get("type")
+    if server_type:
+        return get_servers_by_type(servers, server_type, by_type)
+    
+    return servers
+
+
+def run_operation(
+    command: str,
+    args: Dict[str, Any],
+    servers: List[Server],
+    ssh_base: List[str],
+    by_type: Dict[str, List[Server]]
+) -> None:
+    """
+    Run an operation command on the servers selected by its arguments.
+    
+    Args:
+        command: The operation command
+        args: The command arguments
+        servers: List of server configurations
+        ssh_base: Base SSH command
+        by_type: Server index by type
+    """
+    command_to_run = args.get("command")
+    if command == "run" and not command_to_run:
+        logger.error("Missing command")
+        logger.info("Usage: run [--servers ID1,ID2,...] [--type TYPE] COMMAND")
+        return
+    
+    selected_servers = select_shell_servers(command, args, servers, by_type)
+    operation = get_operation(command)
+    
+    if command == "run":
+        # Run the command directly without the interactive prompt
+        operation(selected_servers, ssh_base, command_to_run)
+    elif command == "shutdown":
+        # Determine if we should run in parallel
+        parallel_mode = settings.get("execution", "parallel", False)
+        operation(selected_servers, ssh_base, parallel=parallel_mode)
+    else:
+        operation(selected_servers, ssh_base)
 
 
 def run_shell_command(
     command: str, 
     args: Dict[str, Any], 
-    servers: List[Dict[str, Any]], 
-    ssh_base: List[str]
+    servers: List[Server], 
+    ssh_base: List[str],
+    by_type: Optional[Dict[str, List[Server]]] = None
 ) -> bool:
     """
     Run a shell command.
@@ -234,6 +264,7 @@ def run_shell_command(
         args: The command arguments
         servers: List of server configurations
         ssh_base: Base SSH command
+        by_type: Optional server index by type (built from servers if None)
         
     Returns:
         bool: True if the command should continue, False to exit
@@ -248,80 +279,21 @@ def run_shell_command(
         list_servers(servers)
     
     elif command == "parallel":
-        value = args.get("servers", ["on"])[0] if args.get("servers") else "on"
-        if value.lower() in ("on", "true", "yes", "1"):
+        value = (args.get("command") or "on").lower()
+        if value in TRUTHY_VALUES:
             settings.set("execution", "parallel", True)
             logger.info_success("Parallel execution enabled")
-        elif value.lower() in ("off", "false", "no", "0"):
+        elif value in FALSY_VALUES:
             settings.set("execution", "parallel", False)
             logger.info("Parallel execution disabled")
         else:
             logger.warning(f"Invalid value for parallel: {value}")
             logger.info("Usage: parallel [on|off]")
     
-    elif command == "download":
-        selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
-        elif args.get("type"):
-            selected_servers = [s for s in servers if s["type"] == args["type"]]
-        
-        download_release_operation(selected_servers, ssh_base)
-    
-    elif command == "build":
-        selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
-        else:
-            selected_servers = [s for s in servers if s["type"] == "build"]
-        
-        build_release_operation(selected_servers, ssh_base)
-    
-    elif command == "start":
-        selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
-        elif args.get("type"):
-            selected_servers = [s for s in servers if s["type"] == args["type"]]
-        
-        start_release_operation(selected_servers, ssh_base)
-    
-    elif command == "shutdown":
-        selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
-        elif args.get("type"):
-            selected_servers = [s for s in servers if s["type"] == args["type"]]
-        
-        # Determine if we should run in parallel
-        parallel_mode = settings.get("execution", "parallel", False)
-        
-        shutdown_release_operation(selected_servers, ssh_base, parallel=parallel_mode)
-    
-    elif command == "update-config":
-        selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
-        elif args.get("type"):
-            selected_servers = [s for s in servers if s["type"] == args["type"]]
-        
-        update_config_operation(selected_servers, ssh_base)
-    
-    elif command == "run":
-        if not args.get("command"):
-            logger.error("Missing command")
-            logger.info("Usage: run [--servers ID1,ID2,...] [--type TYPE] COMMAND")
-            return True
-        
-        selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
-        elif args.get("type"):
-            selected_servers = [s for s in servers if s["type"] == args["type"]]
-        
-        # Run the command directly without the interactive prompt
-        command_to_run = args.get("command")
-        run_command_operation(selected_servers, ssh_base, command_to_run)
+    elif command in OPERATIONS:
+        if by_type is None:
+            _, by_type = build_server_index(servers)
+        run_operation(command, args, servers, ssh_base, by_type)
     
     else:
         if command:
@@ -349,6 +321,15 @@ def run_interactive_shell(servers=None, ssh_base=None) -> None:
         keyfile = select_ssh_key()
         ssh_base = get_ssh_command_base(keyfile)
     
+    # Index servers once for the whole session
+    _, by_type = build_server_index(servers)
+    
+    # Imported here so non-shell invocations don't load prompt_toolkit
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
+    from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+    from src.cli.completer import HBCompleter
+    
     # Create a prompt session with history
     history_file = os.path.expanduser("~/.hb_deploy_history")
     session = PromptSession(
@@ -370,7 +351,7 @@ def run_interactive_shell(servers=None, ssh_base=None) -> None:
                 command, args = parse_shell_command(command_line)
                 
                 # Run the command
-                if not run_shell_command(command, args, servers, ssh_base):
+                if not run_shell_command(command, args, servers, ssh_base, by_type):
                     break
                 
             except KeyboardInterrupt:
@@ -388,4 +369,6 @@ def run_interactive_shell(servers=None, ssh_base=None) -> None:
 
 
 if __name__ == "__main__":
+    # The import-time logger only uses the built-in defaults
+    setup_logging()
     run_interactive_shell() 
\ No newline at end of file
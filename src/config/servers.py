@@ -3,86 +3,174 @@ Server configuration module.
 Handles loading and accessing server configurations.
 """
 
-import json
+import os
 import sys
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Union
 
 from src.utils.logger import logger
+from src.utils.json_codec import loads as _json_loads
 
 # Default configuration file path
 CONFIG_FILE = "./config/servers.json"
 
 
-def load_servers(config_file: str = CONFIG_FILE) -> List[Dict[str, Any]]:
+def _intern(value: Any) -> Any:
+    """Intern a string value, leaving other values untouched."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(frozen=True, slots=True)
+class Server:
+    """A server entry from the server configuration file."""
+    
+    id: str
+    name: str
+    ip: str
+    type: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Server":
+        """
+        Create a server from its configuration dictionary.
+        
+        The field values are interned so comparisons against other interned
+        strings (including literals) short-circuit on identity.
+        
+        Args:
+            data (Dict): Server configuration dictionary.
+            
+        Returns:
+            Server: The server record.
+        """
+        return cls(
+            id=_intern(data["id"]),
+            name=_intern(data["name"]),
+            ip=_intern(data["ip"]),
+            type=_intern(data["type"]),
+        )
+
+
+# Parsed server files keyed by path, with the (mtime_ns, size) they were read at
+_SERVER_CACHE: Dict[str, Tuple[Tuple[int, int], List[Server]]] = {}
+
+
+def load_servers(config_file: str = CONFIG_FILE) -> List[Server]:
     """
     Load server configurations from the specified JSON file.
+    The parsed result is cached until the file's modification time or size changes.
     
     Args:
         config_file (str): Path to the server configuration file.
         
     Returns:
-        List[Dict]: List of server configuration dictionaries.
+        List[Server]: List of server records.
     
     Raises:
         SystemExit: If the configuration file cannot be loaded.
     """
     try:
-        with open(config_file) as f:
-            servers = json.load(f)
-            logger.debug(f"Loaded {len(servers)} servers from {config_file}")
-            return servers
+        st = os.stat(config_file)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = _SERVER_CACHE.get(config_file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        servers = [Server.from_dict(s) for s in _json_loads(Path(config_file).read_bytes())]
+        logger.debug(f"Loaded {len(servers)} servers from {config_file}")
+        _SERVER_CACHE[config_file] = (stamp, servers)
+        return servers
     except Exception as e:
         logger.error_highlight(f"Failed to load server configuration from {config_file}: {e}")
         sys.exit(1)
 
 
-def get_servers_by_type(servers: List[Dict[str, Any]], server_type: str) -> List[Dict[str, Any]]:
+def build_server_index(
+    servers: List[Server]
+) -> Tuple[Dict[str, Server], Dict[str, List[Server]]]:
+    """
+    Index servers by ID and by type in a single pass.
+    
+    Args:
+        servers (List[Server]): List of server configurations.
+        
+    Returns:
+        Tuple[Dict, Dict]: Mapping of server ID to server, and mapping of
+                           server type to the servers of that type.
+    """
+    by_id = {}
+    by_type = {}
+    for server in servers:
+        by_id[server.id] = server
+        by_type.setdefault(server.type, []).append(server)
+    return by_id, by_type
+
+
+def get_servers_by_type(
+    servers: List[Server],
+    server_type: str,
+    by_type: Optional[Dict[str, List[Server]]] = None
+) -> List[Server]:
     """
     Filter servers by their type.
     
     Args:
-        servers (List[Dict]): List of server configurations.
+        servers (List[Server]): List of server configurations.
         server_type (str): The server type to filter by.
+        by_type (Optional[Dict]): Prebuilt type index from build_server_index.
         
     Returns:
-        List[Dict]: Filtered list of server configurations.
+        List[Server]: Filtered list of server configurations.
     """
-    filtered = [s for s in servers if s.get("type") == server_type]
+    if by_type is not None:
+        filtered = list(by_type.get(server_type, ()))
+    else:
+        filtered = [s for s in servers if s.type == server_type]
     logger.debug(f"Filtered {len(filtered)} servers of type '{server_type}'")
     return filtered
 
 
-def get_servers_by_ids(servers: List[Dict[str, Any]], ids: List[str]) -> List[Dict[str, Any]]:
+def get_servers_by_ids(servers: List[Server], ids: Iterable[str]) -> List[Server]:
     """
     Filter servers by their IDs.
+    The servers are returned in configuration file order, whatever the order of ids.
     
     Args:
-        servers (List[Dict]): List of server configurations.
-        ids (List[str]): List of server IDs to filter by.
+        servers (List[Server]): List of server configurations.
+        ids (Iterable[str]): Server IDs to filter by.
         
     Returns:
-        List[Dict]: Filtered list of server configurations.
+        List[Server]: Filtered list of server configurations.
     """
-    filtered = [s for s in servers if s.get("id") in ids]
-    logger.debug(f"Filtered {len(filtered)} servers by IDs: {', '.join(ids)}")
+    ids_set = ids if isinstance(ids, (set, frozenset)) else frozenset(ids)
+    filtered = [s for s in servers if s.id in ids_set]
+    logger.debug(f"Filtered {len(filtered)} servers by IDs: {', '.join(sorted(ids_set))}")
     return filtered
 
 
-def get_server_by_id(servers: List[Dict[str, Any]], server_id: str) -> Optional[Dict[str, Any]]:
+def get_server_by_id(
+    servers: Union[List[Server], Dict[str, Server]],
+    server_id: str
+) -> Optional[Server]:
     """
     Get a server by its ID.
     
     Args:
-        servers (List[Dict]): List of server configurations.
+        servers (Union[List[Server], Dict]): List of server configurations, or an ID
+            index from build_server_index for constant-time lookups.
         server_id (str): The server ID to search for.
         
     Returns:
-        Optional[Dict]: The server configuration, or None if not found.
+        Optional[Server]: The server configuration, or None if not found.
     """
-    for server in servers:
-        if server.get("id") == server_id:
-            logger.debug(f"Found server with ID '{server_id}'")
-            return server
+    if isinstance(servers, dict):
+        server = servers.get(server_id)
+    else:
+        server = next((s for s in servers if s.id == server_id), None)
     
-    logger.debug(f"No server found with ID '{server_id}'")
-    return None 
\ No newline at end of file
+    if server is not None:
+        logger.debug(f"Found server with ID '{server_id}'")
+    else:
+        logger.debug(f"No server found with ID '{server_id}'")
+    return server
@@ -5,12 +5,12 @@ Handles loading and accessing application configuration from different sources.
 
 import os
 import sys
-import yaml
-import toml
-import json
-from typing import Dict, Any, Optional
+import functools
+from typing import Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+from src.utils.json_codec import loads as _json_loads
+
 # Remove the direct import of logger
 # from src.utils.logger import logger, setup_logging
 
@@ -27,6 +27,7 @@ DEFAULT_CONFIG = {
         "batch_mode": True,
         "identity_file": None,
         "agent_sock_path": "~/.ssh/agent_info",
+        "control_persist": 600,  # Seconds an idle multiplexed connection stays open
     },
     
     # HTTP settings
@@ -60,6 +61,7 @@ DEFAULT_CONFIG = {
         "timeout": 300,
         "retry_count": 3,
         "retry_delay": 5,
+        "retry_delay_max": 60,
     },
     
     # Logging settings
@@ -73,6 +75,35 @@ DEFAULT_CONFIG = {
     },
 }
 
+# Accepted spellings for boolean values, compared in lower case
+TRUTHY_VALUES = frozenset(("on", "true", "yes", "1"))
+FALSY_VALUES = frozenset(("off", "false", "no", "0"))
+
+# Environment variable name -> (section, key, type of the default value), e.g.
+# HB_SERVER_CONFIG_FILE -> ("server", "config_file", str). Settings without a
+# default value (None) are read as strings.
+_ENV_INDEX: Dict[str, Tuple[str, str, type]] = {
+    f"HB_{section.upper()}_{key.upper()}": (
+        section, key, str if value is None else type(value)
+    )
+    for section, values in DEFAULT_CONFIG.items()
+    for key, value in values.items()
+}
+
+# Converters from environment variable strings, by the type of the setting's default;
+# other types (str) keep the string value
+_ENV_COERCERS = {
+    bool: lambda value: value.lower() in TRUTHY_VALUES,
+    int: int,
+    float: float,
+}
+
+# Files in the working directory that Settings reads at startup
+_STARTUP_FILES = frozenset(("config.json", "config.yaml", "config.yml", "config.toml", ".env"))
+
+# Stand-in for a missing section in Settings.get; never modified
+_EMPTY_SECTION: Dict[str, Any] = {}
+
 
 class ConfigurationError(Exception):
     """Exception raised for configuration errors."""
@@ -91,82 +122,125 @@ class Settings:
     
     def __init__(self):
         """Initialize the settings with default values."""
-        self._config = DEFAULT_CONFIG.copy()
+        # Copy each section so merges and env overrides never mutate DEFAULT_CONFIG;
+        # leaf values are immutable, so one level of copying is enough
+        self._config = {
+            section: dict(values) if isinstance(values, dict) else values
+            for section, values in DEFAULT_CONFIG.items()
+        }
+        self._present_files = self._scan_startup_files()
         self._load_config_files()
         self._load_env_vars()
     
+    def _scan_startup_files(self) -> frozenset:
+        """
+        Find which of the files read at startup exist in the working directory.
+        One directory listing replaces a stat call per candidate file.
+        
+        Returns:
+            frozenset: Names of the startup files that exist
+        """
+        try:
+            with os.scandir(".") as entries:
+                return frozenset(
+                    entry.name for entry in entries
+                    if entry.name in _STARTUP_FILES and entry.is_file()
+                )
+        except OSError:
+            return frozenset()
+    
     def _load_config_files(self):
-        """Load configuration from files if they exist."""
+        """
+        Load configuration from files if they exist.
+        
+        config.json is the canonical format: when it loads, the YAML and TOML
+        files are not probed or parsed. Otherwise those are merged in order.
+        """
+        if self._load_config_file("config.json", self._load_json):
+            return
+        
         # Order matters: later files override earlier ones
         config_files = [
-            ("config.json", self._load_json),
             ("config.yaml", self._load_yaml),
             ("config.yml", self._load_yaml),
             ("config.toml", self._load_toml),
         ]
         
         for filename, loader in config_files:
-            if os.path.exists(filename):
-                try:
-                    config_data = loader(filename)
-                    self._merge_configs(self._config, config_data)
-                except Exception as e:
-                    # Always use print during initialization to avoid circular imports
-                    print(f"Warning: Failed to load {filename}: {e}", file=sys.stderr)
+            self._load_config_file(filename, loader)
+    
+    def _load_config_file(self, filename: str, loader) -> bool:
+        """
+        Merge a configuration file into the settings if it exists.
+        
+        Args:
+            filename: The configuration file path
+            loader: Function that parses the file into a dictionary
+            
+        Returns:
+            bool: True if the file was loaded and merged
+        """
+        if filename not in self._present_files:
+            return False
+        
+        try:
+            config_data = loader(filename)
+            self._merge_configs(self._config, config_data)
+            return True
+        except Exception as e:
+            # Always use print during initialization to avoid circular imports
+            print(f"Warning: Failed to load {filename}: {e}", file=sys.stderr)
+            return False
     
     def _load_json(self, filename: str) -> Dict[str, Any]:
         """Load JSON configuration file."""
-        with open(filename, "r") as f:
-            return json.load(f)
+        with open(filename, "rb") as f:
+            return _json_loads(f.read())
     
     def _load_yaml(self, filename: str) -> Dict[str, Any]:
         """Load YAML configuration file."""
+        # Imported here so startup doesn't pay for the parser unless a YAML file exists
+        import yaml
+        # Prefer the LibYAML C loader, which is much faster than the pure-Python one
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
         with open(filename, "r") as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=loader)
     
     def _load_toml(self, filename: str) -> Dict[str, Any]:
         """Load TOML configuration file."""
+        # Imported here so startup doesn't pay for the parser unless a TOML file exists
+        import toml
         with open(filename, "r") as f:
             return toml.load(f)
     
     def _load_env_vars(self):
         """Load configuration from environment variables."""
         # Load from .env file if it exists
-        load_dotenv()
-        
-        # Process environment variables that start with HB_
-        for key, value in os.environ.items():
-            if key.startswith("HB_"):
-                # Convert HB_SERVER_CONFIG_FILE to ['server']['config_file']
-                parts = key[3:].lower().split("_")
-                
-                # Navigate to the right place in the config dict
-                current = self._config
-                for part in parts[:-1]:
-                    if part not in current:
-                        current[part] = {}
-                    current = current[part]
-                
-                # Set the value, converting to the appropriate type if possible
-                try:
-                    # Try to determine the type from the existing value if it exists
-                    last_part = parts[-1]
-                    if last_part in current:
-                        existing_value = current[last_part]
-                        if isinstance(existing_value, bool):
-                            current[last_part] = value.lower() in ("true", "yes", "1", "on")
-                        elif isinstance(existing_value, int):
-                            current[last_part] = int(value)
-                        elif isinstance(existing_value, float):
-                            current[last_part] = float(value)
-                        else:
-                            current[last_part] = value
-                    else:
-                        # If there's no existing value, just use the string
-                        current[last_part] = value
-                except (ValueError, TypeError):
-                    # If conversion fails, use the string value
-                    current[parts[-1]] = value
+        if ".env" in self._present_files:
+            load_dotenv(".env")
+        
+        # Collect the HB_ variables once; most environments have none
+        hb_items = [(k, v) for k, v in os.environ.items() if k.startswith("HB_")]
+        if not hb_items:
+            return
+        
+        # Only variables that name a known setting are applied
+        for key, value in hb_items:
+            entry = _ENV_INDEX.get(key)
+            if entry is None:
+                continue
+            
+            section, setting, value_type = entry
+            
+            # Set the value, converting it to the type of the default if possible
+            coerce = _ENV_COERCERS.get(value_type)
+            try:
+                converted = coerce(value) if coerce is not None else value
+            except (ValueError, TypeError):
+                # If conversion fails, use the string value
+                converted = value
+            
+            self._config.setdefault(section, {})[setting] = converted
     
     def _merge_configs(self, target: Dict[str, Any], source: Dict[str, Any]) -> None:
         """
@@ -176,13 +250,26 @@ class Settings:
             target: The target configuration dictionary
             source: The source configuration dictionary
         """
-        for key, value in source.items():
-            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-                # If both are dicts, merge them recursively
-                self._merge_configs(target[key], value)
-            else:
-                # Otherwise, replace the value
-                target[key] = value
+        # Nothing to merge (also covers an empty YAML file, which loads as None)
+        if not source:
+            return
+        
+        # Keys where both sides are dicts are merged recursively
+        nested = {
+            key for key, value in source.items()
+            if isinstance(value, dict) and isinstance(target.get(key), dict)
+        }
+        
+        if not nested:
+            # Nothing to recurse into: replace all values in one bulk update
+            target.update(source)
+            return
+        
+        for key in nested:
+            self._merge_configs(target[key], source[key])
+        
+        # Otherwise, replace the value
+        target.update({key: value for key, value in source.items() if key not in nested})
     
     def get(self, section: str, key: str, default: Any = None) -> Any:
         """
@@ -196,10 +283,24 @@ class Settings:
         Returns:
             The configuration value
         """
-        try:
-            return self._config[section][key]
-        except KeyError:
-            return default
+        return self._config.get(section, _EMPTY_SECTION).get(key, default)
+    
+    @functools.lru_cache(maxsize=128)
+    def get_cached(self, section: str, key: str, default: Any = None) -> Any:
+        """
+        Get a configuration value, memoized for lookups on hot paths.
+        The cache is cleared whenever the settings are changed through set() or
+        update_from_args().
+        
+        Args:
+            section: The configuration section
+            key: The configuration key
+            default: The default value if the key doesn't exist (must be hashable)
+            
+        Returns:
+            The configuration value
+        """
+        return self.get(section, key, default)
     
     def set(self, section: str, key: str, value: Any) -> None:
         """
@@ -213,6 +314,7 @@ class Settings:
         if section not in self._config:
             self._config[section] = {}
         self._config[section][key] = value
+        self.get_cached.cache_clear()
     
     def update_from_args(self, args: Dict[str, Any]) -> None:
         """
@@ -238,6 +340,8 @@ class Settings:
                 else:
                     # Handle top-level keys
                     self._config[key] = value
+        
+        self.get_cached.cache_clear()
     
     def get_all(self) -> Dict[str, Any]:
         """
@@ -249,5 +353,19 @@ class Settings:
         return self._config
 
 
-# Create a singleton instance
-settings = Settings() 
\ No newline at end of file
+class _LazySettings:
+    """
+    Stand-in for the settings singleton that defers loading until first use.
+    Importing this module no longer reads config files or the environment; on the
+    first attribute access the instance becomes a Settings and initializes itself,
+    so existing references to the singleton keep working.
+    """
+    
+    def __getattr__(self, name: str) -> Any:
+        self.__class__ = Settings
+        self.__init__()
+        return getattr(self, name)
+
+
+# Create a singleton instance, loaded on first use
+settings = _LazySettings()
@@ -11,19 +11,27 @@ from src.utils.logger import logger, setup_logging
 
 # Then import other modules
 from src.config.settings import settings
-from src.config.servers import load_servers
+from src.config.servers import load_servers, get_servers_by_ids, get_servers_by_type
 from src.ssh.key_manager import select_ssh_key, get_ssh_command_base
 from src.ui.menu import display_menu, get_user_menu_choice
-from src.cli.arguments import parse_arguments, update_settings_from_args
-from src.cli.shell import run_interactive_shell
+from src.cli.arguments import parse_arguments, update_settings_from_args, BARE_SHELL_ARGS
+# Operations are imported through get_operation when they first run
+from src.cli.shell import run_interactive_shell, get_operation
 
-# Import operations
-from src.operations.build import build_release_operation
-from src.operations.download import download_release_operation
-from src.operations.start import start_release_operation
-from src.operations.shutdown import shutdown_release_operation
-from src.operations.update_config import update_config_operation
-from src.operations.run_command import run_command_operation
+
+def _deferred_operation(command: str) -> Callable:
+    """
+    Wrap an operation so its module is only imported when it is called.
+    
+    Args:
+        command: The operation's shell command name
+        
+    Returns:
+        Callable: Function that runs the operation
+    """
+    def run(*args, **kwargs):
+        return get_operation(command)(*args, **kwargs)
+    return run
 
 
 def create_menu() -> Dict[str, Tuple[str, Callable]]:
@@ -34,12 +42,12 @@ def create_menu() -> Dict[str, Tuple[str, Callable]]:
         Dict[str, Tuple[str, Callable]]: Menu items dictionary.
     """
     return {
-        "1": ("download_release", download_release_operation),
-        "2": ("build_release", build_release_operation),
-        "3": ("start_release", start_release_operation),
-        "4": ("shutdown_release", shutdown_release_operation),
-        "5": ("update_config", update_config_operation),
-        "6": ("run", run_command_operation),
+        "1": ("download_release", _deferred_operation("download")),
+        "2": ("build_release", _deferred_operation("build")),
+        "3": ("start_release", _deferred_operation("start")),
+        "4": ("shutdown_release", _deferred_operation("shutdown")),
+        "5": ("update_config", _deferred_operation("update-config")),
+        "6": ("run", _deferred_operation("run")),
     }
 
 
@@ -79,61 +87,46 @@ def run_cli_mode(args: Dict[str, Any]) -> int:
     # Handle other operations
     try:
         # Filter servers by --servers or --type arguments
+        server_ids = args.get("servers")
+        server_type = args.get("type")
         selected_servers = servers
-        if args.get("servers"):
-            selected_servers = [s for s in servers if s["id"] in args["servers"]]
+        if server_ids:
+            # server_ids is a set, so this is a single pass that keeps config file order
+            selected_servers = get_servers_by_ids(servers, server_ids)
             if not selected_servers:
-                logger.error(f"No servers found matching the provided IDs: {args['servers']}")
+                logger.error(f"No servers found matching the provided IDs: {', '.join(sorted(server_ids))}")
                 return 1
-        elif args.get("type"):
-            server_type = args.get("type")
-            selected_servers = [s for s in servers if s["type"] == server_type]
-            if server_type == "all":
-                selected_servers = servers
+        elif server_type and server_type != "all":
+            selected_servers = get_servers_by_type(servers, server_type)
             if not selected_servers:
                 logger.error(f"No servers found with type: {server_type}")
                 return 1
         
         # Pre-selected servers flag (true when servers were selected via CLI args)
-        pre_selected = bool(args.get("servers") or args.get("type"))
+        pre_selected = bool(server_ids or server_type)
+        
+        # Parallel execution preference from args, falling back to settings
+        parallel_mode = args.get("parallel")
+        if parallel_mode is None:
+            parallel_mode = settings.get("execution", "parallel")
         
-        if operation == "download":
-            download_release_operation(selected_servers, ssh_base)
-        elif operation == "build":
-            build_release_operation(selected_servers, ssh_base)
-        elif operation == "start":
-            start_release_operation(selected_servers, ssh_base)
+        if operation in ("download", "build", "start", "update-config"):
+            get_operation(operation)(selected_servers, ssh_base)
         elif operation == "shutdown":
-            # Get parallel execution preference from settings or args
-            parallel_mode = None
-            if args.get("parallel") is not None:
-                parallel_mode = args.get("parallel")
-            elif settings.get("execution", "parallel") is not None:
-                parallel_mode = settings.get("execution", "parallel")
-                
-            shutdown_release_operation(
+            get_operation("shutdown")(
                 selected_servers, 
                 ssh_base,
                 skip_server_selection=pre_selected,
                 parallel=parallel_mode
             )
-        elif operation == "update-config":
-            update_config_operation(selected_servers, ssh_base)
         elif operation == "run":
             cmd = args.get("command")
             if not cmd:
                 logger.error("No command specified for 'run' operation")
                 return 1
                 
-            # Get parallel execution preference from settings or args
-            parallel_mode = None
-            if args.get("parallel") is not None:
-                parallel_mode = args.get("parallel")
-            elif settings.get("execution", "parallel") is not None:
-                parallel_mode = settings.get("execution", "parallel")
-                
             # Skip server selection if servers were pre-selected from command line
-            run_command_operation(
+            get_operation("run")(
                 selected_servers, 
                 ssh_base, 
                 cmd,
@@ -200,8 +193,11 @@ def main() -> int:
     Returns:
         int: Exit code
     """
-    # Parse command-line arguments
-    args = parse_arguments()
+    # Parse command-line arguments; a bare "shell" needs no argparse work
+    if sys.argv[1:] == ["shell"]:
+        args = dict(BARE_SHELL_ARGS)
+    else:
+        args = parse_arguments()
     
     # Update settings from arguments
     update_settings_from_args(args)
@@ -3,8 +3,13 @@ Build release operation module.
 Handles building releases on build servers.
 """
 
-from typing import Dict, List, Any
+import shlex
+import itertools
+import concurrent.futures
+from typing import List
 
+from src.config.servers import Server
+from src.config.settings import settings
 from src.ssh.executor import run_command_on_server
 from src.ui.menu import select_servers
 from src.utils.helpers import generate_random_string
@@ -12,12 +17,12 @@ from src.utils.logger import logger
 from src.utils.exceptions import BuildError
 
 
-def build_release_operation(servers: List[Dict[str, Any]], ssh_base: List[str]) -> None:
+def build_release_operation(servers: List[Server], ssh_base: List[str]) -> None:
     """
     Build a release on build servers.
     
     Args:
-        servers (List[Dict[str, Any]]): List of all server configurations.
+        servers (List[Server]): List of all server configurations.
         ssh_base (List[str]): Base SSH command with options.
     """
     # Select build servers
@@ -26,55 +31,48 @@ def build_release_operation(servers: List[Dict[str, Any]], ssh_base: List[str])
         logger.warning("No build servers selected, exiting operation")
         return
     
-    for server in sel:
-        logger.info(f"Starting build process on server {server['name']}")
-        try:
-            # Backup content.Dockerfile
-            logger.debug(f"Backing up content.Dockerfile on {server['name']}")
-            success, _ = run_command_on_server(
-                server, 
-                "cp hb-os/resources/content.Dockerfile hb-os/resources/content.Dockerfile.bak", 
-                ssh_base
-            )
-            
-            if not success:
-                raise BuildError(server, "Failed to backup content.Dockerfile")
-            
-            # Inject random 64-character string into content.Dockerfile
-            random_str = generate_random_string(64)
-            logger.debug(f"Injecting build identifier into content.Dockerfile on {server['name']}")
-            inject_cmd = f"sed -i '/RUN mkdir -p \\/build \\/release/a RUN echo \\\"{random_str}\\\"' /home/hb/hb-os/resources/content.Dockerfile"
-            success, _ = run_command_on_server(server, inject_cmd, ssh_base)
-            
-            if not success:
-                raise BuildError(server, "Failed to modify content.Dockerfile")
-            
-            # Run the build commands
-            logger.info(f"Building guest on {server['name']}")
-            success, _ = run_command_on_server(server, "cd hb-os && ./run build_guest", ssh_base)
-            
-            if not success:
-                raise BuildError(server, "Failed to build guest")
-            
-            logger.info(f"Packaging release on {server['name']}")
-            success, _ = run_command_on_server(
-                server, 
-                "cd hb-os && sudo rm -rf inputs.json release release.tar.gz && sudo ./run package_release", 
-                ssh_base
-            )
-            
-            if not success:
-                raise BuildError(server, "Failed to package release")
-            
-            logger.info(f"Build completed successfully on {server['name']}")
-            
-        except Exception as e:
-            logger.error(f"Build failed on {server['name']}: {e}", exc_info=True)
-        finally:
-            # Always restore content.Dockerfile
-            logger.debug(f"Restoring content.Dockerfile on {server['name']}")
-            run_command_on_server(
-                server, 
-                "mv hb-os/resources/content.Dockerfile.bak hb-os/resources/content.Dockerfile", 
-                ssh_base
-            ) 
\ No newline at end of file
+    # Servers are built independently and the work is SSH-bound, so run them concurrently
+    max_workers = settings.get("execution", "max_workers", 5)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the iterator so every build finishes before returning
+        list(executor.map(_build_one, sel, itertools.repeat(ssh_base)))
+
+
+def _build_one(server: Server, ssh_base: List[str]) -> None:
+    """
+    Build a release on a single build server.
+    Failures are logged rather than raised so other builds keep running.
+    
+    Args:
+        server (Server): The build server.
+        ssh_base (List[str]): Base SSH command with options.
+    """
+    logger.info(f"Starting build process on server {server.name}")
+    
+    # Inject random 64-character string into content.Dockerfile
+    random_str = generate_random_string(64)
+    
+    # Run every step in one SSH session. The trap restores content.Dockerfile when
+    # the script exits, whether or not a step failed.
+    script = "; ".join([
+        "set -e",
+        "cd hb-os",
+        "cp resources/content.Dockerfile resources/content.Dockerfile.bak",
+        "trap 'mv resources/content.Dockerfile.bak resources/content.Dockerfile' EXIT",
+        f"sed -i '/RUN mkdir -p \\/build \\/release/a RUN echo \\\"{random_str}\\\"' resources/content.Dockerfile",
+        "./run build_guest",
+        "sudo rm -rf inputs.json release release.tar.gz",
+        "sudo ./run package_release",
+    ])
+    
+    try:
+        logger.info(f"Building and packaging release on {server.name}")
+        success, _ = run_command_on_server(server, f"bash -c {shlex.quote(script)}", ssh_base)
+        
+        if not success:
+            raise BuildError(server, "Build script failed")
+        
+        logger.info(f"Build completed successfully on {server.name}")
+        
+    except Exception as e:
+        logger.error(f"Build failed on {server.name}: {e}", exc_info=True)
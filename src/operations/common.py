@@ -0,0 +1,33 @@
+"""
+Common operation helpers module.
+Contains logic shared by several operations.
+"""
+
+from typing import Optional
+
+from src.config.settings import settings
+from src.ui.menu import get_user_input
+from src.utils.logger import logger
+
+
+def resolve_parallel(parallel: Optional[bool] = None) -> bool:
+    """
+    Decide whether an operation should run in parallel mode.
+    
+    Args:
+        parallel (Optional[bool]): Explicit choice. If None, the execution.parallel
+            setting is used, and the user is asked when that is disabled.
+        
+    Returns:
+        bool: True to run in parallel mode.
+    """
+    if parallel is not None:
+        return bool(parallel)
+    
+    if settings.get_cached("execution", "parallel", False):
+        # Use the setting if available
+        logger.info("Using parallel execution from settings")
+        return True
+    
+    # Otherwise ask the user
+    return get_user_input("Run in parallel? (y/n): ").lower() == "y"
@@ -4,24 +4,50 @@ Handles downloading releases from build servers to other servers.
 """
 
 import time
-from typing import Dict, List, Any
+import itertools
+import concurrent.futures
+from typing import List
 
+from src.config.servers import Server
+from src.config.settings import settings
 from src.ssh.executor import run_command_on_server
+from src.ssh.parallel import run_parallel_command, run_parallel_commands
+from src.utils.helpers import wait_for_port
 from src.utils.logger import logger
 from src.utils.exceptions import MaxRetriesExceededError
 
+# Serve the release with darkhttpd, which sends files with sendfile(2), falling
+# back to Python's http.server on build servers that don't have it installed
+HTTP_SERVER_START_CMD = (
+    "cd hb-os && if command -v darkhttpd > /dev/null 2>&1; "
+    "then nohup darkhttpd . --port 8000 > /dev/null 2>&1 & "
+    "else nohup python3 -m http.server 8000 > /dev/null 2>&1 & fi"
+)
 
-def download_release_operation(servers: List[Dict[str, Any]], ssh_base: List[str]) -> None:
+# Prints "present" if the build server has a packaged release to serve
+RELEASE_CHECK_CMD = "test -f hb-os/release.tar.gz && echo present; exit 0"
+
+# Stop whichever of the two servers was started. The bracketed first letters keep
+# the patterns from matching the remote shell running this command, whose own
+# command line contains them; only one server runs, so a pkill without a match
+# is expected and the exit status is ignored.
+HTTP_SERVER_STOP_CMD = (
+    "pkill -f '[d]arkhttpd . --port 8000'; "
+    "pkill -f '[p]ython3 -m http.server 8000'; exit 0"
+)
+
+
+def download_release_operation(servers: List[Server], ssh_base: List[str]) -> None:
     """
     Download a release from build servers to other servers.
     
     Args:
-        servers (List[Dict[str, Any]]): List of all server configurations.
+        servers (List[Server]): List of all server configurations.
         ssh_base (List[str]): Base SSH command with options.
     """
     # Use all servers, but separate builds from the rest
-    builds = [s for s in servers if s['type'] == 'build']
-    others = [s for s in servers if s['type'] != 'build']
+    builds = [s for s in servers if s.type == 'build']
+    others = [s for s in servers if s.type != 'build']
     
     if not builds:
         logger.error_highlight("No build servers found. Cannot download release.")
@@ -31,26 +57,38 @@ def download_release_operation(servers: List[Dict[str, Any]], ssh_base: List[str
         logger.error_highlight("No target servers found. Nothing to download to.")
         return
     
-    # Start HTTP server on build servers
+    # Builds are run per server, so only serve from build servers that have a release
+    builds = _builds_with_release(builds, ssh_base)
+    
+    # Start HTTP servers on those build servers at once
+    logger.info(f"Starting HTTP server on {len(builds)} build servers")
+    run_parallel_command(
+        builds,
+        HTTP_SERVER_START_CMD,
+        ssh_base
+    )
+    
+    # Wait until each server accepts connections instead of sleeping a fixed time;
+    # the servers started together, so they share one deadline
+    deadline = time.monotonic() + settings.get("http", "timeout", 2)
     for build_server in builds:
-        logger.info(f"Starting HTTP server on build server {build_server['name']}")
-        run_command_on_server(
-            build_server, 
-            "cd hb-os && nohup python3 -m http.server 8000 > /dev/null 2>&1 &", 
-            ssh_base
-        )
-        time.sleep(1)
+        if not wait_for_port(build_server.ip, 8000, max(deadline - time.monotonic(), 0)):
+            logger.warning(f"HTTP server on {build_server.name} is not responding yet")
     
     try:
-        # Download to each target server
-        for target_server in others:
-            logger.info(f"Downloading release to {target_server['name']}")
-            download_cmd = f"cd hb-os && sudo ./run download_release --url http://{builds[0]['ip']}:8000/release.tar.gz"
-            success, _ = run_command_on_server(target_server, download_cmd, ssh_base)
-            
-            if not success:
-                error_msg = f"Failed to download release on server {target_server['name']}. Skipping."
-                logger.error_highlight(error_msg)
+        # Spread the targets round-robin over the build servers, downloading concurrently
+        max_workers = settings.get("execution", "max_workers", 5)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                _download_to, others, itertools.cycle(builds), itertools.repeat(ssh_base)
+            ))
+        
+        # Report failures once all downloads have finished
+        failed = [target.name for target, success in zip(others, results) if not success]
+        if failed:
+            logger.error_highlight(f"Failed to download release on servers: {', '.join(failed)}")
+        else:
+            logger.info_success(f"Release downloaded to all {len(others)} servers")
     except Exception as e:
         logger.error(f"Error during download operation: {e}", exc_info=True)
         raise
@@ -58,8 +96,51 @@ def download_release_operation(servers: List[Dict[str, Any]], ssh_base: List[str
         # Always stop HTTP servers
         logger.info("Stopping HTTP servers on build servers")
         for build_server in builds:
-            run_command_on_server(
-                build_server, 
-                "pkill -f 'python3 -m http.server 8000'", 
-                ssh_base
-            ) 
\ No newline at end of file
+            run_command_on_server(build_server, HTTP_SERVER_STOP_CMD, ssh_base)
+
+
+def _builds_with_release(builds: List[Server], ssh_base: List[str]) -> List[Server]:
+    """
+    Find the build servers that have a packaged release to serve.
+    If none of them reports one, the first build server is used, as the release
+    may still be there even though the check failed.
+    
+    Args:
+        builds (List[Server]): The build servers.
+        ssh_base (List[str]): Base SSH command with options.
+        
+    Returns:
+        List[Server]: The build servers to download from.
+    """
+    results = run_parallel_commands(builds, RELEASE_CHECK_CMD, ssh_base, print_output=False)
+    sources = [
+        b for b in builds
+        if isinstance(results.get(b.id), str) and results[b.id].strip() == "present"
+    ]
+    
+    if not sources:
+        logger.warning(f"No build server reported a release, using {builds[0].name}")
+        return builds[:1]
+    
+    skipped = [b.name for b in builds if b not in sources]
+    if skipped:
+        logger.info(f"Skipping build servers without a release: {', '.join(skipped)}")
+    return sources
+
+
+def _download_to(target_server: Server, build_server: Server, ssh_base: List[str]) -> bool:
+    """
+    Download the release from a build server to a target server.
+    
+    Args:
+        target_server (Server): The server to download the release to.
+        build_server (Server): The build server serving the release.
+        ssh_base (List[str]): Base SSH command with options.
+        
+    Returns:
+        bool: True if the download succeeded.
+    """
+    logger.info(f"Downloading release to {target_server.name} from {build_server.name}")
+    download_cmd = f"cd hb-os && sudo ./run download_release --url http://{build_server.ip}:8000/release.tar.gz"
+    success, _ = run_command_on_server(target_server, download_cmd, ssh_base)
+    return success
@@ -3,14 +3,15 @@ Run command operation module.
 Handles running arbitrary commands on servers.
 """
 
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Optional, Union, Tuple
 
+from src.config.servers import Server
 from src.ssh.executor import run_command_on_servers
 from src.ssh.parallel import run_parallel_command
 from src.ui.menu import select_servers, get_user_input
+from src.operations.common import resolve_parallel
 from src.utils.logger import logger
 from src.utils.exceptions import SSHCommandError
-from src.config.settings import settings
 
 
 def get_command_input() -> Optional[str]:
@@ -31,7 +32,7 @@ def get_command_input() -> Optional[str]:
 
 
 def run_command_operation(
-    servers: List[Dict[str, Any]], 
+    servers: List[Server], 
     ssh_base: List[str],
     command: Optional[str] = None,
     skip_server_selection: bool = False,
@@ -41,7 +42,7 @@ def run_command_operation(
     Run a command on selected servers.
     
     Args:
-        servers (List[Dict[str, Any]]): List of server configurations.
+        servers (List[Server]): List of server configurations.
         ssh_base (List[str]): Base SSH command with options.
         command (Optional[str]): Command to run. If None, will prompt the user.
         skip_server_selection (bool): Whether to skip server selection.
@@ -69,17 +70,7 @@ def run_command_operation(
     
     try:
         # Determine if we should run in parallel
-        run_parallel = parallel
-        
-        # If parallel mode wasn't specified, check settings or ask the user
-        if run_parallel is None:
-            if settings.get("execution", "parallel", False):
-                # Use the setting if available
-                run_parallel = True
-                logger.info("Using parallel execution from settings")
-            else:
-                # Otherwise ask the user
-                run_parallel = get_user_input("Run in parallel? (y/n): ").lower() == "y"
+        run_parallel = resolve_parallel(parallel)
         
         results = None
         success = False
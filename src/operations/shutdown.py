@@ -3,18 +3,19 @@ Shutdown operation module.
 Handles terminating QEMU processes on servers.
 """
 
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Optional, Union, Tuple
 
+from src.config.servers import Server
 from src.ssh.executor import run_command_on_server, run_command_on_servers
 from src.ssh.parallel import run_parallel_command
-from src.ui.menu import select_servers, get_user_input
+from src.ui.menu import select_servers
+from src.operations.common import resolve_parallel
 from src.utils.logger import logger
 from src.utils.exceptions import SSHCommandError
-from src.config.settings import settings
 
 
 def shutdown_release_operation(
-    servers: List[Dict[str, Any]], 
+    servers: List[Server], 
     ssh_base: List[str],
     skip_server_selection: bool = False,
     parallel: Optional[bool] = None
@@ -23,7 +24,7 @@ def shutdown_release_operation(
     Terminate QEMU processes on selected servers.
     
     Args:
-        servers (List[Dict[str, Any]]): List of server configurations.
+        servers (List[Server]): List of server configurations.
         ssh_base (List[str]): Base SSH command with options.
         skip_server_selection (bool): Whether to skip server selection.
         parallel (Optional[bool]): Whether to run in parallel mode. If None, will use settings or prompt.
@@ -43,17 +44,7 @@ def shutdown_release_operation(
     
     try:
         # Determine if we should run in parallel
-        run_parallel = parallel
-        
-        # If parallel mode wasn't specified, check settings
-        if run_parallel is None:
-            if settings.get("execution", "parallel", False):
-                # Use the setting if available
-                run_parallel = True
-                logger.info("Using parallel execution from settings")
-            else:
-                # Otherwise ask the user
-                run_parallel = get_user_input("Run in parallel? (y/n): ").lower() == "y"
+        run_parallel = resolve_parallel(parallel)
         
         # Shutdown command - terminate any QEMU system processes
         command = "sudo pkill -9 qemu-syst || true"
@@ -71,19 +62,45 @@ def shutdown_release_operation(
             success, results = run_command_on_servers(sel, command, ssh_base, stop_on_failure=False)
         
         # Verify that processes were terminated
-        for server in sel:
-            logger.info(f"Verifying shutdown on {server['name']}")
-            check_cmd = "pgrep -l qemu-syst || echo 'No QEMU processes found'"
-            success, output = run_command_on_server(server, check_cmd, ssh_base)
-            
-            if "No QEMU processes found" not in output and "qemu-syst" in output:
-                logger.warning_highlight(f"QEMU processes may still be running on {server['name']}")
-            else:
-                logger.info_success(f"Successfully shut down QEMU on {server['name']}")
+        # pgrep -c prints the number of matching processes; it exits 1 when there are none
+        check_cmd = "pgrep -c qemu-syst; exit 0"
+        if run_parallel:
+            logger.info("Verifying shutdown in parallel mode")
+            check_results = run_parallel_command(sel, check_cmd, ssh_base)
+            for server in sel:
+                output = check_results.get(server.id)
+                if isinstance(output, Exception) or output is None:
+                    logger.warning_highlight(f"Could not verify shutdown on {server.name}: {output}")
+                else:
+                    _report_shutdown(server, output)
+        else:
+            for server in sel:
+                logger.info(f"Verifying shutdown on {server.name}")
+                _, output = run_command_on_server(server, check_cmd, ssh_base)
+                _report_shutdown(server, output)
         
         logger.info_success("Shutdown operation completed")
         return success, results
     
     except Exception as e:
         logger.error(f"Error during shutdown operation: {e}", exc_info=True)
-        raise 
\ No newline at end of file
+        raise
+
+
+def _report_shutdown(server: Server, output: str) -> None:
+    """
+    Log whether QEMU processes are still running on a server.
+    
+    Args:
+        server (Server): The server that was checked.
+        output (str): Output of the pgrep check command.
+    """
+    # The count is the last line; SSH warnings may come before it
+    lines = output.strip().splitlines()
+    count = lines[-1].strip() if lines else ""
+    if not count.isdigit():
+        logger.warning_highlight(f"Could not verify shutdown on {server.name}: {output.strip()}")
+    elif int(count) > 0:
+        logger.warning_highlight(f"QEMU processes may still be running on {server.name}")
+    else:
+        logger.info_success(f"Successfully shut down QEMU on {server.name}")
@@ -3,21 +3,22 @@ Update config operation module.
 Handles updating configuration on servers.
 """
 
-import os
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, Optional
 
-from src.ssh.executor import run_command_on_server, run_command_on_servers
+from src.config.servers import Server
+from src.ssh.executor import run_command_on_server, open_master_connections
 from src.ui.menu import select_servers
 from src.utils.logger import logger
 from src.utils.exceptions import ConfigurationError
 
 
-def update_config_operation(servers: List[Dict[str, Any]], ssh_base: List[str]) -> None:
+def update_config_operation(servers: List[Server], ssh_base: List[str]) -> None:
     """
     Update configuration on selected servers.
     
     Args:
-        servers (List[Dict[str, Any]]): List of all server configurations.
+        servers (List[Server]): List of all server configurations.
         ssh_base (List[str]): Base SSH command with options.
     """
     # Select all servers by default
@@ -28,72 +29,57 @@ def update_config_operation(servers: List[Dict[str, Any]], ssh_base: List[str])
     
     logger.info_highlight(f"Updating configuration on selected servers")
     
+    open_master_connections([s for s in sel if s.type != 'build'], ssh_base)
+    
     try:
         updated_count = 0
         skipped_count = 0
+        type_configs: Dict[str, Optional[str]] = {}
         
         for server in sel:
             # Skip build servers
-            if server['type'] == 'build':
-                logger.debug(f"Skipping build server {server['name']}")
+            if server.type == 'build':
+                logger.debug(f"Skipping build server {server.name}")
                 skipped_count += 1
                 continue
                 
-            logger.info(f"Updating config on {server['name']} ({server['type']})")
+            logger.info(f"Updating config on {server.name} ({server.type})")
             
-            # Check if the config file exists for this server type
-            config_file_path = f"./config/types/{server['type']}.jsonc"
-            if not os.path.exists(config_file_path):
+            # Check if the config file exists for this server type; each type's file is
+            # read once and reused for the other servers of that type
+            config_file_path = f"./config/types/{server.type}.jsonc"
+            if server.type not in type_configs:
+                type_configs[server.type] = _read_config_file(config_file_path)
+            content = type_configs[server.type]
+            if content is None:
                 logger.warning_highlight(f"Config file not found: {config_file_path}")
-                logger.warning(f"Skipping config update for {server['name']}")
+                logger.warning(f"Skipping config update for {server.name}")
                 skipped_count += 1
                 continue
             
             try:
-                # Create backups directory on the server if it doesn't exist
-                logger.debug(f"Creating backups directory on {server['name']}")
-                backup_dir_cmd = "mkdir -p /home/hb/hb-os/config/backups"
-                success, _ = run_command_on_server(server, backup_dir_cmd, ssh_base)
-                
-                if not success:
-                    logger.warning(f"Could not create backups directory on {server['name']}, proceeding anyway")
-                
-                # Backup existing config with timestamp
-                logger.debug(f"Backing up existing configuration on {server['name']}")
-                timestamp_cmd = "date +%s"  # Get Unix timestamp
-                success, timestamp_output = run_command_on_server(server, timestamp_cmd, ssh_base, print_output=False)
-                timestamp = timestamp_output.strip() if success else "unknown"
-                
-                backup_file = f"/home/hb/hb-os/config/backups/server-{timestamp}.jsonc"
-                backup_cmd = f"cp /home/hb/hb-os/config/server.jsonc {backup_file} 2>/dev/null || true"
-                success, _ = run_command_on_server(server, backup_cmd, ssh_base)
-                
-                if success:
-                    logger.info(f"Created backup: {backup_file}")
-                else:
-                    logger.warning(f"Could not backup config on {server['name']}, proceeding anyway")
-                
-                # Read the configuration file
-                with open(config_file_path, "r") as f:
-                    content = f.read()
-                
-                # Escape single quotes in the content to prevent shell interpretation issues
-                escaped_content = content.replace("'", "'\\''")
-                
-                # Write the content to the server
-                update_cmd = f"echo '{escaped_content}' > /home/hb/hb-os/config/server.jsonc"
-                success, output = run_command_on_server(server, update_cmd, ssh_base)
+                # Back up the existing config with a timestamp and write the new one in a
+                # single SSH call. A failed backup doesn't stop the update; the content is
+                # streamed over stdin, so it never passes through the remote shell.
+                backup_file = f"/home/hb/hb-os/config/backups/server-{int(time.time())}.jsonc"
+                logger.debug(f"Backing up existing configuration on {server.name} to {backup_file}")
+                update_cmd = (
+                    "mkdir -p /home/hb/hb-os/config/backups; "
+                    f"cp /home/hb/hb-os/config/server.jsonc {backup_file} 2>/dev/null; "
+                    "cat > /home/hb/hb-os/config/server.jsonc"
+                )
+                success, output = run_command_on_server(server, update_cmd, ssh_base, stdin=content)
                 
                 if not success:
-                    error_msg = f"Failed to update configuration on {server['name']}"
+                    error_msg = f"Failed to update configuration on {server.name}"
                     logger.error_highlight(error_msg)
-                    raise ConfigurationError(f"Failed to update config on {server['name']}")
+                    raise ConfigurationError(f"Failed to update config on {server.name}")
                 
-                logger.info_success(f"Successfully updated configuration on {server['name']}")
+                logger.info_success(f"Successfully updated configuration on {server.name}")
                 updated_count += 1
                 
             except Exception as e:
-                logger.error_highlight(f"Error updating config on {server['name']}: {e}")
+                logger.error_highlight(f"Error updating config on {server.name}: {e}")
                 logger.error(f"Error details:", exc_info=True)
                 skipped_count += 1
     
@@ -101,4 +87,21 @@ def update_config_operation(servers: List[Dict[str, Any]], ssh_base: List[str])
         logger.error_highlight(f"Error during configuration update: {e}")
         logger.error(f"Error details:", exc_info=True)
     
-    logger.info_highlight(f"Configuration update completed: {updated_count} updated, {skipped_count} skipped") 
\ No newline at end of file
+    logger.info_highlight(f"Configuration update completed: {updated_count} updated, {skipped_count} skipped")
+
+
+def _read_config_file(path: str) -> Optional[str]:
+    """
+    Read a server type's configuration file.
+    
+    Args:
+        path (str): Path to the configuration file.
+        
+    Returns:
+        Optional[str]: The file content, or None if the file doesn't exist.
+    """
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
@@ -3,64 +3,97 @@ SSH executor module.
 Handles execution of commands on remote servers via SSH.
 """
 
+import atexit
+import shlex
 import subprocess
-from typing import Dict, List, Any, Optional, Tuple
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple
 
+from src.config.servers import Server
+from src.config.settings import settings
 from src.utils.logger import logger
 from src.utils.exceptions import SSHCommandError
 
+# Base SSH command last used for each host, so their multiplexed master
+# connections can be closed when the program exits
+_CONNECTED_HOSTS: Dict[str, List[str]] = {}
+
 
 def run_command_on_server(
-    server: Dict[str, Any], 
+    server: Server, 
     command: str, 
     ssh_base: List[str],
-    print_output: bool = True
+    print_output: bool = True,
+    stdin: Optional[str] = None
 ) -> Tuple[bool, str]:
     """
     Run a command on a specific server via SSH.
     
     Args:
-        server (Dict[str, Any]): Server configuration dictionary.
+        server (Server): Server configuration.
         command (str): Command to run on the server.
         ssh_base (List[str]): Base SSH command with options.
         print_output (bool): Whether to print command output to console.
+        stdin (Optional[str]): Data to send to the command's standard input.
         
     Returns:
         Tuple[bool, str]: Tuple containing success status and command output.
     """
-    host = f"hb@{server['ip']}"
+    host = f"hb@{server.ip}"
+    _CONNECTED_HOSTS[host] = ssh_base
     
     if print_output:
-        logger.info_highlight(f"{server['name']} - {server['ip']}:\n{command}")
+        logger.info_highlight(f"{server.name} - {server.ip}:\n{command}")
     
-    logger.debug(f"Executing on {server['name']}: {command}")
+    logger.debug(f"Executing on {server.name}: {command}")
     
     try:
-        proc = subprocess.run(
-            ssh_base + [host, command],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True
-        )
+        if print_output and stdin is None:
+            # Log output lines as they arrive, so long-running commands show progress.
+            # Several servers may stream at once, so each line names its server.
+            with subprocess.Popen(
+                ssh_base + [host, command],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            ) as proc:
+                out_lines = []
+                for line in proc.stdout:
+                    out_lines.append(line)
+                    text = line.rstrip("\n")
+                    logger.info(f"[{server.name}] {text}")
+                returncode = proc.wait()
+            output = "".join(out_lines)
+        else:
+            proc = subprocess.run(
+                ssh_base + [host, command],
+                input=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True
+            )
+            returncode = proc.returncode
+            output = proc.stdout
+            if print_output:
+                logger.info(output)
         
-        output = proc.stdout
-        success = proc.returncode == 0
+        success = returncode == 0
         
         if success:
-            logger.debug(f"Command succeeded on {server['name']}")
+            logger.debug(f"Command succeeded on {server.name}")
         else:
-            logger.error(f"Command failed on {server['name']} with code {proc.returncode}: {command}")
+            logger.error(f"Command failed on {server.name} with code {returncode}: {command}")
         
         if print_output:
-            logger.info(output)
             if success:
-                logger.info_success("Command Finished")
+                logger.info_success(f"Command Finished on {server.name}")
             else:
-                logger.error_highlight(f"Command Failed with code {proc.returncode}")
+                logger.error_highlight(f"Command Failed on {server.name} with code {returncode}")
         
         return success, output
     except Exception as e:
-        error_msg = f"Error executing SSH command on {server['name']}: {e}"
+        error_msg = f"Error executing SSH command on {server.name}: {e}"
         logger.error(error_msg, exc_info=True)
         if print_output:
             logger.error_highlight(error_msg)
@@ -68,47 +101,143 @@ def run_command_on_server(
 
 
 def run_command_on_servers(
-    servers: List[Dict[str, Any]], 
+    servers: List[Server], 
     command: str, 
     ssh_base: List[str],
     stop_on_failure: bool = False
 ) -> Tuple[bool, Dict[str, str]]:
     """
     Run a command on multiple servers.
+    The commands run concurrently, but their output is reported in server order.
     
     Args:
-        servers (List[Dict[str, Any]]): List of server configurations.
+        servers (List[Server]): List of server configurations.
         command (str): Command to run on each server.
         ssh_base (List[str]): Base SSH command with options.
         stop_on_failure (bool): Whether to stop if a command fails on a server.
+            Commands that have not started yet are cancelled.
         
     Returns:
         Tuple[bool, Dict[str, str]]: Tuple containing overall success status and 
                                     dictionary of server IDs to command outputs.
     """
-    logger.info(f"Running command: {command}")
     logger.info(f"Running command on {len(servers)} servers: {command}")
     
     results = {}
     all_success = True
     
-    for server in servers:
-        logger.debug(f"Running command on {server['name']}")
-        success, output = run_command_on_server(server, command, ssh_base)
-        results[server['id']] = output
+    max_workers = settings.get_cached("execution", "max_workers", 5)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(run_command_on_server, server, command, ssh_base, False)
+            for server in servers
+        ]
         
-        if not success:
-            all_success = False
-            error_msg = f"Command failed on {server['name']}"
-            logger.error(error_msg)
+        for i, (server, future) in enumerate(zip(servers, futures)):
+            success, output = future.result()
+            results[server.id] = output
             
-            if stop_on_failure:
-                logger.warning(f"Stopping further execution due to failure on {server['name']}")
-                break
+            logger.info_highlight(f"{server.name} - {server.ip}:\n{command}")
+            logger.info(output)
+            
+            if not success:
+                all_success = False
+                error_msg = f"Command failed on {server.name}"
+                logger.error(error_msg)
+                
+                if stop_on_failure:
+                    logger.warning(f"Stopping further execution due to failure on {server.name}")
+                    for pending in futures[i + 1:]:
+                        pending.cancel()
+                    break
     
     if all_success:
         logger.info_success("Command executed successfully on all servers")
     else:
         logger.warning_highlight("Command failed on one or more servers")
     
-    return all_success, results 
\ No newline at end of file
+    return all_success, results
+
+
+def wait_until_stopped(
+    server: Server,
+    ssh_base: List[str],
+    pattern: str = "qemu-syst",
+    timeout: float = 5.0,
+    interval: float = 0.1
+) -> bool:
+    """
+    Wait for processes matching a pattern to exit on a server.
+    The polling runs remotely in one SSH call, so it returns as soon as the
+    processes are gone instead of after a fixed delay.
+    
+    Args:
+        server (Server): Server configuration.
+        ssh_base (List[str]): Base SSH command with options.
+        pattern (str): Process name pattern passed to pgrep.
+        timeout (float): Maximum time to wait (in seconds).
+        interval (float): Delay between checks (in seconds).
+        
+    Returns:
+        bool: True if no matching processes remain, False if timed out.
+    """
+    attempts = max(1, round(timeout / interval))
+    poll_cmd = (
+        f"for i in $(seq {attempts}); do "
+        f"pgrep {shlex.quote(pattern)} > /dev/null || exit 0; sleep {interval}; "
+        "done; exit 1"
+    )
+    success, _ = run_command_on_server(server, poll_cmd, ssh_base, print_output=False)
+    if not success:
+        logger.warning(f"Processes matching '{pattern}' still running on {server.name} after {timeout}s")
+    return success
+
+
+def open_master_connections(servers: List[Server], ssh_base: List[str]) -> None:
+    """
+    Open multiplexed SSH master connections to several servers concurrently.
+    Later commands to these servers reuse the connections instead of each
+    server's first command paying for its own handshake in turn. Servers that
+    can't be reached are left for their commands to report.
+    
+    Args:
+        servers (List[Server]): Servers to connect to.
+        ssh_base (List[str]): Base SSH command with ControlMaster options.
+    """
+    def _open(server: Server) -> None:
+        host = f"hb@{server.ip}"
+        _CONNECTED_HOSTS[host] = ssh_base
+        # -f -N authenticates, then leaves the master running in the background
+        subprocess.run(
+            ssh_base + ["-f", "-N", host],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    
+    logger.debug(f"Opening SSH connections to {len(servers)} servers")
+    max_workers = settings.get_cached("execution", "max_workers", 5)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(_open, servers))
+
+
+def close_master_connections() -> None:
+    """
+    Close the multiplexed SSH master connections used by this process.
+    The control path is shared, so another hb-deploy run may have sessions on
+    the same master. "-O stop" only stops it accepting new sessions; the master
+    exits once the sessions still using it finish. Hosts without a master
+    connection are ignored.
+    """
+    for host, ssh_base in list(_CONNECTED_HOSTS.items()):
+        subprocess.run(
+            ssh_base + ["-O", "stop", host],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    _CONNECTED_HOSTS.clear()
+
+
+# Close master connections however the program exits, including entry points
+# other than main() such as running the shell module directly
+atexit.register(close_master_connections)
@@ -4,14 +4,28 @@ Handles SSH key selection, authentication, and SSH agent interactions.
 """
 
 import os
-import glob
+import stat
+import functools
 import subprocess
 import re
 from typing import List, Optional, Tuple, Dict
 
+from src.config.settings import settings
 from src.ui.colors import Colors
 from src.utils.logger import logger
 
+# Common non-key files to exclude from the key list
+_EXCLUDED_KEY_NAMES = frozenset(("config", "known_hosts", "authorized_keys", "agent_info", "last_selected_key"))
+_EXCLUDED_KEY_EXTENSIONS = (".pub", ".config", ".old", ".bak")
+
+# Fingerprint hash in ssh-keygen -l / ssh-add -l output, either a hashed
+# fingerprint (SHA256:..., the default) or a legacy hex MD5 one
+_FINGERPRINT_RE = re.compile(r'([A-Z0-9]+:[A-Za-z0-9+/=]{20,}|[0-9a-f]{2}(:[0-9a-f]{2})+)')
+
+# Variable assignments in ssh-agent -s output, e.g.
+# "SSH_AUTH_SOCK=/tmp/ssh-XXXX/agent.123; export SSH_AUTH_SOCK;"
+_AGENT_ENV_RE = re.compile(r'^(SSH_AUTH_SOCK|SSH_AGENT_PID)=([^;\n]*)', re.MULTILINE)
+
 
 def find_ssh_keys() -> List[str]:
     """
@@ -22,26 +36,34 @@ def find_ssh_keys() -> List[str]:
     """
     ssh_dir = os.path.expanduser("~/.ssh")
     candidates = []
-    # Common non-key files to exclude
-    excluded_names = ["config", "known_hosts", "authorized_keys", "agent_info", "last_selected_key"]
-    excluded_extensions = [".pub", ".config", ".old", ".bak"]
     
-    for p in glob.glob(os.path.join(ssh_dir, "*")):
-        name = os.path.basename(p)
-        # Skip known non-key files
-        if name in excluded_names:
-            continue
-        # Skip files with known non-key extensions
-        if any(name.endswith(ext) for ext in excluded_extensions):
-            continue
-        # Skip directories
-        if not os.path.isfile(p):
-            continue
-        # Skip very large files (keys are small)
-        if os.path.getsize(p) > 10000:  # Most SSH keys are under 10KB
-            continue
+    try:
+        entries = os.scandir(ssh_dir)
+    except OSError:
+        return candidates
+    
+    # scandir reuses the directory entry's type information, so only the size
+    # check costs a stat call, and only for files that got that far
+    with entries:
+        for entry in entries:
+            name = entry.name
+            # Skip hidden files, which glob("*") used to leave out
+            if name.startswith("."):
+                continue
+            # Skip known non-key files
+            if name in _EXCLUDED_KEY_NAMES:
+                continue
+            # Skip files with known non-key extensions
+            if name.endswith(_EXCLUDED_KEY_EXTENSIONS):
+                continue
+            # Skip directories
+            if not entry.is_file():
+                continue
+            # Skip very large files (keys are small)
+            if entry.stat().st_size > 10000:  # Most SSH keys are under 10KB
+                continue
             
-        candidates.append(p)
+            candidates.append(entry.path)
     return candidates
 
 
@@ -61,28 +83,22 @@ def load_agent_from_file() -> bool:
             agent_output = f.read()
         
         # Extract environment variables from agent output
-        for line in agent_output.splitlines():
-            if line.startswith("SSH_AUTH_SOCK=") or line.startswith("SSH_AGENT_PID="):
-                var, value = line.split(";", 1)[0].split("=", 1)
-                os.environ[var] = value
+        os.environ.update(_AGENT_ENV_RE.findall(agent_output))
         
-        # Verify the agent is actually running
-        pid_str = os.environ.get('SSH_AGENT_PID')
+        # Verify the agent is actually running: a live agent's socket exists. The
+        # PID isn't checked, since PIDs are recycled and prove nothing on their own.
         sock_path = os.environ.get('SSH_AUTH_SOCK')
+        if not sock_path:
+            return False
+        
+        try:
+            if stat.S_ISSOCK(os.stat(sock_path).st_mode):
+                logger.debug(f"Found SSH agent socket {sock_path} (pid {os.environ.get('SSH_AGENT_PID')})")
+                return True
+        except OSError:
+            # Socket doesn't exist
+            pass
         
-        if pid_str and sock_path:
-            # Check if the process exists
-            try:
-                pid = int(pid_str)
-                # On Unix, sending signal 0 checks if process exists
-                os.kill(pid, 0)
-                # Also verify socket exists
-                if os.path.exists(sock_path):
-                    return True
-            except (OSError, ValueError):
-                # Process doesn't exist or invalid PID
-                pass
-                
         return False
         
     except Exception as e:
@@ -130,10 +146,7 @@ def start_ssh_agent() -> bool:
         # Start ssh-agent and capture its environment variables
         agent_output = subprocess.check_output(["ssh-agent", "-s"], text=True)
         # Parse and set environment variables
-        for line in agent_output.splitlines():
-            if line.startswith("SSH_AUTH_SOCK=") or line.startswith("SSH_AGENT_PID="):
-                var, value = line.split(";", 1)[0].split("=", 1)
-                os.environ[var] = value
+        os.environ.update(_AGENT_ENV_RE.findall(agent_output))
         logger.info_success("SSH agent started.")
         
         # Save agent info to a file for future script runs
@@ -158,8 +171,7 @@ def extract_fingerprint(output: str) -> Optional[str]:
     Returns:
         Optional[str]: The fingerprint if found, None otherwise
     """
-    # Regular expression to extract the fingerprint hash
-    match = re.search(r'([0-9a-f]{2}(:[0-9a-f]{2})+)', output)
+    match = _FINGERPRINT_RE.search(output)
     if match:
         return match.group(1)
     return None
@@ -168,40 +180,49 @@ def extract_fingerprint(output: str) -> Optional[str]:
 def check_key_in_agent(key_path: str) -> bool:
     """
     Check if a key is already added to the SSH agent.
+    Results are memoized per key file version and agent, since each check
+    spawns a subprocess; the agent's key list is fetched once for all keys.
+    
+    Args:
+        key_path (str): Path to the SSH key file.
+        
+    Returns:
+        bool: True if the key is already in the agent, False otherwise.
+    """
+    try:
+        mtime = os.path.getmtime(key_path)
+    except OSError:
+        mtime = None
+    return _check_key_in_agent_cached(key_path, mtime, os.environ.get('SSH_AUTH_SOCK'))
+
+
+@functools.lru_cache(maxsize=32)
+def _check_key_in_agent_cached(key_path: str, mtime: Optional[float], agent_sock: Optional[str]) -> bool:
+    """
+    Check if a key is in the SSH agent; see check_key_in_agent.
     
     Args:
         key_path (str): Path to the SSH key file.
+        mtime (Optional[float]): Modification time of the key file (cache key only).
+        agent_sock (Optional[str]): SSH agent socket path.
         
     Returns:
         bool: True if the key is already in the agent, False otherwise.
     """
     try:
+        agent_fingerprints = _agent_fingerprints(agent_sock)
+        if not agent_fingerprints:
+            return False
+        
         # Get the key fingerprint
         key_fingerprint_cmd = ["ssh-keygen", "-l", "-f", key_path]
         key_result = subprocess.run(key_fingerprint_cmd, capture_output=True, text=True)
         
         if key_result.returncode == 0:
             key_fingerprint = extract_fingerprint(key_result.stdout)
-            if key_fingerprint:
-                # List keys in the agent with fingerprints
-                agent_cmd = ["ssh-add", "-l"]
-                agent_result = subprocess.run(agent_cmd, capture_output=True, text=True, env=os.environ)
-                
-                # Check if the fingerprint is in the agent output
-                if agent_result.returncode == 0 and key_fingerprint in agent_result.stdout:
-                    logger.debug(f"Key {os.path.basename(key_path)} is already in the agent")
-                    return True
-        
-        # Test the key with SSH
-        # Try to make a non-interactive connection (this will fail, but we're checking the error message)
-        test_cmd = ["ssh", "-o", "BatchMode=yes", "-o", "IdentitiesOnly=yes", "-i", key_path, "-p", "22", "user@localhost", "true"]
-        test_result = subprocess.run(test_cmd, capture_output=True, text=True, timeout=2)
-        
-        # If we get permission denied (public key), the key is loaded but not authorized
-        # If we get connection refused, the key is loaded but localhost isn't running SSH
-        if "Permission denied (publickey)" in test_result.stderr or "Connection refused" in test_result.stderr:
-            logger.debug(f"Key {os.path.basename(key_path)} is in the agent (verified by test connection)")
-            return True
+            if key_fingerprint in agent_fingerprints:
+                logger.debug(f"Key {os.path.basename(key_path)} is already in the agent")
+                return True
                     
     except Exception as e:
         logger.debug(f"Error checking if key is in agent: {e}")
@@ -209,9 +230,38 @@ def check_key_in_agent(key_path: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=4)
+def _agent_fingerprints(agent_sock: Optional[str]) -> frozenset:
+    """
+    List the fingerprints of the keys loaded in the SSH agent.
+    The agent is queried once and the result shared by all key checks.
+    
+    Args:
+        agent_sock (Optional[str]): SSH agent socket path (cache key only).
+        
+    Returns:
+        frozenset: Fingerprints of the loaded keys; empty if the agent has no
+                   keys or can't be queried.
+    """
+    try:
+        agent_result = subprocess.run(["ssh-add", "-l"], capture_output=True, text=True, env=os.environ)
+    except Exception as e:
+        logger.debug(f"Error listing keys in agent: {e}")
+        return frozenset()
+    
+    if agent_result.returncode != 0:
+        return frozenset()
+    
+    fingerprints = (extract_fingerprint(line) for line in agent_result.stdout.splitlines())
+    return frozenset(fp for fp in fingerprints if fp)
+
+
 def add_key_to_agent(key_path: str) -> bool:
     """
     Add an SSH key to the agent.
+    Safe to call for a key that is already loaded: the agent's cached
+    fingerprint set is consulted first, and ssh-add only runs when the key
+    isn't in it (or its fingerprint can't be read).
     
     Args:
         key_path (str): Path to the SSH key file.
@@ -228,6 +278,9 @@ def add_key_to_agent(key_path: str) -> bool:
     result = subprocess.run(["ssh-add", key_path], capture_output=True, text=True)
     
     if result.returncode == 0:
+        # The memoized agent contents and key checks are now out of date
+        _agent_fingerprints.cache_clear()
+        _check_key_in_agent_cached.cache_clear()
         logger.info_success("Key added successfully!")
         return True
     else:
@@ -269,8 +322,7 @@ def select_ssh_key() -> Optional[str]:
                     logger.info(f"{Colors.CYAN}Previously selected key: {os.path.basename(cached_key)}{Colors.RESET}")
                     use_cached = input(f"Use this key? (Y/n): ").strip().lower()
                     if use_cached == "" or use_cached == "y":
-                        if not check_key_in_agent(cached_key):
-                            add_key_to_agent(cached_key)
+                        add_key_to_agent(cached_key)
                         return cached_key
         except Exception:
             # Ignore errors with cached key, just continue
@@ -294,8 +346,7 @@ def select_ssh_key() -> Optional[str]:
                 pass
             
             # Add the key to the agent if needed
-            if not check_key_in_agent(selected_key):
-                add_key_to_agent(selected_key)
+            add_key_to_agent(selected_key)
             
             return selected_key
         logger.warning("Invalid selection, try again.")
@@ -327,4 +378,14 @@ def get_ssh_command_base(key_path: Optional[str] = None) -> List[str]:
         "-o", "IdentitiesOnly=no"  # Allow to use identities from ssh-agent
     ])
     
+    # Multiplex commands to the same host over one connection, so only the first
+    # command pays for the TCP handshake and authentication
+    ssh_dir = os.path.expanduser("~/.ssh")
+    os.makedirs(ssh_dir, mode=0o700, exist_ok=True)
+    cmd.extend([
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={os.path.join(ssh_dir, 'cm_%C')}",
+        "-o", f"ControlPersist={settings.get('ssh', 'control_persist', 600)}",
+    ])
+    
     return cmd 
\ No newline at end of file
@@ -4,12 +4,15 @@ Provides parallel execution of SSH commands across multiple servers.
 """
 
 import time
+import random
+import threading
 import concurrent.futures
 from typing import Dict, List, Any, Callable, Optional, Tuple, Union
 
+from src.config.servers import Server
 from src.config.settings import settings
 from src.utils.logger import logger
-from src.utils.exceptions import SSHCommandError, MaxRetriesExceededError
+from src.utils.exceptions import SSHCommandError, MaxRetriesExceededError, OperationCancelledError
 from src.ssh.executor import run_command_on_server
 
 
@@ -20,10 +23,13 @@ def retry(
     retry_delay: Optional[int] = None,
     exceptions_to_retry: Tuple[Exception] = (Exception,),
     operation_name: str = "operation",
+    stop: Optional[threading.Event] = None,
     **kwargs
 ) -> Any:
     """
     Retry a function multiple times with exponential backoff.
+    Each delay is drawn uniformly between zero and the exponential bound, which
+    is capped at the execution.retry_delay_max setting.
     
     Args:
         func: The function to retry
@@ -32,6 +38,7 @@ def retry(
         retry_delay: Initial delay between retries in seconds (from settings if None)
         exceptions_to_retry: Tuple of exceptions that should trigger a retry
         operation_name: Name of the operation for logging
+        stop: Event that, once set, stops further attempts
         **kwargs: Keyword arguments to pass to the function
         
     Returns:
@@ -39,18 +46,24 @@ def retry(
         
     Raises:
         MaxRetriesExceededError: If the maximum number of retries is exceeded
+        OperationCancelledError: If the stop event is set before an attempt
     """
     # Get retry configuration from settings if not specified
     if retry_count is None:
-        retry_count = settings.get("execution", "retry_count", 3)
+        retry_count = settings.get_cached("execution", "retry_count", 3)
     
     if retry_delay is None:
-        retry_delay = settings.get("execution", "retry_delay", 5)
+        retry_delay = settings.get_cached("execution", "retry_delay", 5)
+    
+    retry_delay_max = settings.get_cached("execution", "retry_delay_max", 60)
     
     attempt = 0
     last_exception = None
     
     while attempt <= retry_count:
+        if stop is not None and stop.is_set():
+            raise OperationCancelledError(operation_name)
+        
         try:
             return func(*args, **kwargs)
         except exceptions_to_retry as e:
@@ -61,13 +74,19 @@ def retry(
                 logger.error(f"Maximum retries ({retry_count}) exceeded for {operation_name}")
                 break
             
-            # Calculate exponential backoff delay
-            delay = retry_delay * (2 ** (attempt - 1))
+            # Exponential backoff with full jitter, so servers that failed together
+            # don't all retry in lockstep
+            cap = min(retry_delay * (2 ** (attempt - 1)), retry_delay_max)
+            delay = random.uniform(0, cap)
             logger.warning(
                 f"Attempt {attempt}/{retry_count} failed for {operation_name}: {str(e)}. "
-                f"Retrying in {delay} seconds..."
+                f"Retrying in {delay:.1f} seconds..."
             )
-            time.sleep(delay)
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                # Stopped while backing off
+                raise OperationCancelledError(operation_name)
     
     # If we get here, all retries failed
     raise MaxRetriesExceededError(
@@ -77,12 +96,13 @@ def retry(
 
 
 def run_command_with_retry(
-    server: Dict[str, Any],
+    server: Server,
     command: str,
     ssh_base: List[str],
     print_output: bool = True,
     retry_count: Optional[int] = None,
-    retry_delay: Optional[int] = None
+    retry_delay: Optional[int] = None,
+    stop: Optional[threading.Event] = None
 ) -> Tuple[bool, str]:
     """
     Run a command on a server with retry.
@@ -94,11 +114,12 @@ def run_command_with_retry(
         print_output: Whether to print command output
         retry_count: Number of retries
         retry_delay: Delay between retries in seconds
+        stop: Event that, once set, stops further attempts
         
     Returns:
         Tuple of success status and command output
     """
-    operation_name = f"SSH command on {server['name']}"
+    operation_name = f"SSH command on {server.name}"
     
     return retry(
         run_command_on_server,
@@ -106,12 +127,13 @@ def run_command_with_retry(
         retry_count=retry_count,
         retry_delay=retry_delay,
         exceptions_to_retry=(SSHCommandError, ConnectionError, TimeoutError),
-        operation_name=operation_name
+        operation_name=operation_name,
+        stop=stop
     )
 
 
 def run_parallel_command(
-    servers: List[Dict[str, Any]],
+    servers: List[Server],
     command: str,
     ssh_base: List[str],
     stop_on_failure: bool = False
@@ -141,7 +163,7 @@ def run_parallel_command(
     )
     
     # Count successes and failures
-    failures = sum(1 for s in servers if isinstance(results.get(s['id']), Exception))
+    failures = sum(1 for s in servers if isinstance(results.get(s.id), Exception))
     
     if failures == 0:
         logger.info_success(f"Command executed successfully on all {len(servers)} servers")
@@ -153,7 +175,7 @@ def run_parallel_command(
 
 
 def run_parallel_commands(
-    servers: List[Dict[str, Any]],
+    servers: List[Server],
     command: str,
     ssh_base: List[str],
     max_workers: Optional[int] = None,
@@ -165,72 +187,140 @@ def run_parallel_commands(
 ) -> Dict[str, Union[str, Exception]]:
     """
     Run a command on multiple servers in parallel.
+    Servers that share a host (the same IP) run the command only once, and each
+    of them gets that run's result, so the command should not rely on running
+    once per server entry.
     
     Args:
         servers: List of server configurations
         command: Command to run
         ssh_base: Base SSH command
         max_workers: Maximum number of worker threads
-        timeout: Timeout for each command in seconds
+        timeout: Overall timeout for the commands to finish, in seconds
         print_output: Whether to print command output
-        stop_on_failure: Whether to stop if a command fails
+        stop_on_failure: Whether to stop if a command fails. Commands already
+            running are waited for; servers whose command never started get an
+            OperationCancelledError.
         retry_count: Number of retries for each command
         retry_delay: Initial delay between retries in seconds
         
     Returns:
-        Dictionary mapping server IDs to command outputs or exceptions
+        Dictionary mapping server IDs to command outputs or exceptions. Servers
+        still running when the timeout expires get a TimeoutError, and their
+        commands keep running in the background.
     """
     # Get configuration from settings if not specified
     if max_workers is None:
-        max_workers = settings.get("execution", "max_workers", 5)
+        max_workers = settings.get_cached("execution", "max_workers", 5)
     
     if timeout is None:
-        timeout = settings.get("execution", "timeout", 300)
+        timeout = settings.get_cached("execution", "timeout", 300)
     
     results = {}
-    futures = {}
+    # (future, servers on its host) pairs in submission order
+    futures: List[Tuple[concurrent.futures.Future, List[Server]]] = []
+    # Set on failure when stop_on_failure is enabled, or when the timeout expires,
+    # so workers don't start further attempts
+    stop = threading.Event()
     
     logger.info(f"Running command in parallel on {len(servers)} servers: {command}")
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        for server in servers:
+    # Group servers by host, so each host is connected to only once
+    by_host: Dict[str, List[Server]] = {}
+    for server in servers:
+        by_host.setdefault(server.ip, []).append(server)
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    timed_out = False
+    try:
+        # Submit one task per host, run as the host's first server
+        for host_servers in by_host.values():
             future = executor.submit(
                 run_command_with_retry,
-                server,
+                host_servers[0],
                 command,
                 ssh_base,
                 print_output,
                 retry_count,
-                retry_delay
+                retry_delay,
+                stop
             )
-            futures[future] = server
+            futures.append((future, host_servers))
         
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(futures):
-            server = futures[future]
+        # Collect results as they complete. The timeout bounds the whole run, not
+        # each command, so servers stuck behind slow ones can't extend it.
+        log_error = logger.error  # Bound once for the loop below
+        servers_of = dict(futures)
+        for future in concurrent.futures.as_completed(servers_of, timeout=timeout):
+            host_servers = servers_of[future]
+            server = host_servers[0]
             try:
-                success, output = future.result(timeout=timeout)
-                results[server['id']] = output
+                success, output = future.result()
+                for s in host_servers:
+                    results[s.id] = output
                 
                 if not success and stop_on_failure:
-                    # Cancel remaining futures
-                    for f in futures:
-                        if not f.done():
-                            f.cancel()
-                    logger.error(f"Command failed on {server['name']}, stopping remaining tasks")
+                    stop.set()
+                    log_error(f"Command failed on {server.name}, stopping remaining tasks")
                     break
                     
             except Exception as e:
-                logger.error(f"Error running command on {server['name']}: {str(e)}")
-                results[server['id']] = e
+                log_error(f"Error running command on {server.name}: {str(e)}")
+                for s in host_servers:
+                    results[s.id] = e
                 
                 if stop_on_failure:
-                    # Cancel remaining futures
-                    for f in futures:
-                        if not f.done():
-                            f.cancel()
-                    logger.error(f"Command failed on {server['name']}, stopping remaining tasks")
+                    stop.set()
+                    log_error(f"Command failed on {server.name}, stopping remaining tasks")
                     break
     
-    return results 
\ No newline at end of file
+    except concurrent.futures.TimeoutError:
+        # Commands still running past the deadline must not start new retries
+        stop.set()
+        timed_out = True
+    
+    finally:
+        # Queued commands are dropped. After a stop, the running ones are waited
+        # for (retry starts no new attempts once stop is set), so callers don't
+        # move on while they still run; after a timeout they are left to finish
+        # in the background.
+        executor.shutdown(wait=not timed_out, cancel_futures=True)
+    
+    # Give every server without a result yet an explicit one
+    unfinished = []
+    for future, host_servers in futures:
+        if host_servers[0].id in results:
+            continue
+        if future.done() and not future.cancelled():
+            # Finished after the loop stopped collecting
+            outcome = _future_outcome(future)
+        elif timed_out:
+            unfinished.extend(host_servers)
+            continue
+        else:
+            outcome = OperationCancelledError(f"SSH command on {host_servers[0].name}")
+        for s in host_servers:
+            results[s.id] = outcome
+    
+    if timed_out:
+        logger.error(f"Timed out after {timeout}s waiting for {len(unfinished)} servers")
+        for server in unfinished:
+            results[server.id] = TimeoutError(f"Command on {server.name} timed out after {timeout}s")
+    
+    return results
+
+
+def _future_outcome(future: concurrent.futures.Future) -> Union[str, Exception]:
+    """
+    Get the result entry for a finished run_command_with_retry future.
+    
+    Args:
+        future: A finished, not cancelled, future
+        
+    Returns:
+        The command output, or the exception the command raised
+    """
+    error = future.exception()
+    if error is not None:
+        return error
+    return future.result()[1]
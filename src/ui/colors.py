@@ -2,16 +2,34 @@
 ANSI color codes for terminal output.
 """
 
+import os
+import sys
+
+# Colors are only emitted to an interactive terminal, and can be turned off with
+# the NO_COLOR convention (https://no-color.org). When disabled, every code below
+# is an empty string, so colored messages come out as plain text.
+COLORS_ENABLED = (
+    sys.stdout is not None
+    and sys.stdout.isatty()
+    and not os.environ.get("NO_COLOR")
+)
+
+
+def _code(sequence: str) -> str:
+    """Return the escape sequence if colors are enabled, otherwise an empty string."""
+    return sequence if COLORS_ENABLED else ""
+
+
 class Colors:
-    RESET = "\033[0m"
-    RED = "\033[91m"
-    GREEN = "\033[92m"
-    YELLOW = "\033[93m"
-    BLUE = "\033[94m"
-    MAGENTA = "\033[95m"
-    CYAN = "\033[96m"
-    BOLD = "\033[1m"
-    UNDERLINE = "\033[4m"
+    RESET = _code("\033[0m")
+    RED = _code("\033[91m")
+    GREEN = _code("\033[92m")
+    YELLOW = _code("\033[93m")
+    BLUE = _code("\033[94m")
+    MAGENTA = _code("\033[95m")
+    CYAN = _code("\033[96m")
+    BOLD = _code("\033[1m")
+    UNDERLINE = _code("\033[4m")
     
     @classmethod
     def colorize(cls, text, color):
@@ -25,6 +43,8 @@ class Colors:
         Returns:
             str: The colorized text
         """
+        if not COLORS_ENABLED:
+            return text
         return f"{color}{text}{cls.RESET}"
     
     @classmethod
@@ -3,11 +3,22 @@ UI menu module.
 Handles user interface elements like menus and server selection.
 """
 
-from typing import Dict, List, Any, Optional, Callable, Tuple
+from typing import Dict, List, Optional, Callable, Tuple
 
+from src.config.servers import Server
 from src.ui.colors import Colors
 from src.utils.logger import logger
 
+# Color used for each server type in the server list
+_TYPE_COLORS = {
+    'router': Colors.GREEN,
+    'compute': Colors.RED,
+    'build': Colors.BLUE,
+    'dev': Colors.MAGENTA,
+}
+
+_SELECT_SERVERS_PROMPT = f"Select servers by ID (e.g. {Colors.YELLOW}1{Colors.RESET},{Colors.YELLOW}2{Colors.RESET},{Colors.YELLOW}3{Colors.RESET}) or by type (e.g. {Colors.RED}compute{Colors.RESET}, {Colors.BLUE}build{Colors.RESET}, {Colors.GREEN}router{Colors.RESET}, {Colors.MAGENTA}dev{Colors.RESET}):"
+
 
 def display_menu(menu_items: Dict[str, Tuple[str, Callable]]) -> None:
     """
@@ -55,18 +66,18 @@ def get_user_menu_choice(menu_items: Dict[str, Tuple[str, Callable]]) -> Optiona
     return menu_items[choice]
 
 
-def select_servers(servers: List[Dict[str, Any]], server_type: Optional[str] = None, all_servers: bool = False) -> List[Dict[str, Any]]:
+def select_servers(servers: List[Server], server_type: Optional[str] = None, all_servers: bool = False) -> List[Server]:
     """
     Prompt the user to select servers either by comma-separated IDs
     (if input starts with a digit) or by type (if input starts with a letter).
     
     Args:
-        servers (List[Dict[str, Any]]): List of server configurations.
+        servers (List[Server]): List of server configurations.
         server_type (Optional[str]): Server type to filter by automatically.
         all_servers (bool): Whether to select all servers.
         
     Returns:
-        List[Dict[str, Any]]: List of selected server configurations.
+        List[Server]: List of selected server configurations.
     """
     # If requested all servers or a specific type
     if all_servers:
@@ -74,7 +85,7 @@ def select_servers(servers: List[Dict[str, Any]], server_type: Optional[str] = N
     
     # If a type was passed in, just use it
     if server_type is not None:
-        sel = [s for s in servers if s.get("type") == server_type]
+        sel = [s for s in servers if s.type == server_type]
         if not sel:
             logger.warning(f"No servers of type '{server_type}' found.")
         return sel
@@ -83,20 +94,10 @@ def select_servers(servers: List[Dict[str, Any]], server_type: Optional[str] = N
     logger.info_highlight("Available servers:")
     for s in servers:
         # Determine the color based on server type
-        if s['type'] == 'router':
-            type_color = Colors.GREEN
-        elif s['type'] == 'compute':
-            type_color = Colors.RED
-        elif s['type'] == 'build':
-            type_color = Colors.BLUE
-        elif s['type'] == 'dev':
-            type_color = Colors.MAGENTA
-        else:
-            type_color = Colors.RESET
-        logger.info(f"{Colors.BOLD}{s['id']}{Colors.RESET}) {Colors.BOLD}{s['name']}{Colors.RESET} ({type_color}{s['type']}{Colors.RESET})")
-
-    prompt = f"Select servers by ID (e.g. {Colors.YELLOW}1{Colors.RESET},{Colors.YELLOW}2{Colors.RESET},{Colors.YELLOW}3{Colors.RESET}) or by type (e.g. {Colors.RED}compute{Colors.RESET}, {Colors.BLUE}build{Colors.RESET}, {Colors.GREEN}router{Colors.RESET}, {Colors.MAGENTA}dev{Colors.RESET}):"
-    logger.info(prompt)
+        type_color = _TYPE_COLORS.get(s.type, Colors.RESET)
+        logger.info(f"{Colors.BOLD}{s.id}{Colors.RESET}) {Colors.BOLD}{s.name}{Colors.RESET} ({type_color}{s.type}{Colors.RESET})")
+
+    logger.info(_SELECT_SERVERS_PROMPT)
     inp = input("> ").strip()
     
     if not inp:
@@ -106,13 +107,13 @@ def select_servers(servers: List[Dict[str, Any]], server_type: Optional[str] = N
     first = inp[0]
     if first.isdigit():
         # Treat input as comma-separated IDs
-        ids = [i.strip() for i in inp.split(",") if i.strip()]
-        sel = [s for s in servers if s.get("id") in ids]
+        ids = {i.strip() for i in inp.split(",") if i.strip()}
+        sel = [s for s in servers if s.id in ids]
     elif first.isalpha():
         if (inp == "all"):
             return servers
         # Treat input as a server type
-        sel = [s for s in servers if s.get("type") == inp]
+        sel = [s for s in servers if s.type == inp]
     else:
         logger.warning("Invalid selection format.")
         return []
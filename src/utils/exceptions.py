@@ -1,6 +1,9 @@
 """
 Custom exceptions module.
 Defines custom exception classes for the application.
+
+Exceptions that carry structured fields build their message in __str__, so
+exceptions that are caught and retried never pay for formatting it.
 """
 
 
@@ -24,15 +27,19 @@ class SSHConnectionError(SSHError):
     
     def __init__(self, server=None, message=None, cause=None):
         self.server = server
+        self.message = message
         self.cause = cause
-        msg = f"Failed to connect to server"
-        if server:
-            msg += f" {server['name']} ({server['ip']})"
-        if message:
-            msg += f": {message}"
-        if cause:
-            msg += f" - {str(cause)}"
-        super().__init__(msg)
+        super().__init__(server, message, cause)
+    
+    def __str__(self):
+        parts = ["Failed to connect to server"]
+        if self.server:
+            parts.append(f" {self.server.name} ({self.server.ip})")
+        if self.message:
+            parts.append(f": {self.message}")
+        if self.cause:
+            parts.append(f" - {str(self.cause)}")
+        return "".join(parts)
 
 
 class SSHCommandError(SSHError):
@@ -43,15 +50,17 @@ class SSHCommandError(SSHError):
         self.server = server
         self.return_code = return_code
         self.output = output
-        
-        msg = "SSH command failed"
-        if server:
-            msg += f" on {server['name']} ({server['ip']})"
-        if command:
-            msg += f": {command}"
-        if return_code is not None:
-            msg += f" (exit code: {return_code})"
-        super().__init__(msg)
+        super().__init__(command, server, return_code, output)
+    
+    def __str__(self):
+        parts = ["SSH command failed"]
+        if self.server:
+            parts.append(f" on {self.server.name} ({self.server.ip})")
+        if self.command:
+            parts.append(f": {self.command}")
+        if self.return_code is not None:
+            parts.append(f" (exit code: {self.return_code})")
+        return "".join(parts)
 
 
 class SSHKeyError(SSHError):
@@ -64,12 +73,16 @@ class RouterError(HBDeployError):
     
     def __init__(self, router=None, message=None):
         self.router = router
-        msg = "Router error"
-        if router:
-            msg += f" on {router['name']} ({router['ip']})"
-        if message:
-            msg += f": {message}"
-        super().__init__(msg)
+        self.message = message
+        super().__init__(router, message)
+    
+    def __str__(self):
+        parts = ["Router error"]
+        if self.router:
+            parts.append(f" on {self.router.name} ({self.router.ip})")
+        if self.message:
+            parts.append(f": {self.message}")
+        return "".join(parts)
 
 
 class TimeoutError(HBDeployError):
@@ -78,12 +91,15 @@ class TimeoutError(HBDeployError):
     def __init__(self, operation=None, timeout=None):
         self.operation = operation
         self.timeout = timeout
-        msg = "Operation timed out"
-        if operation:
-            msg += f": {operation}"
-        if timeout:
-            msg += f" after {timeout} seconds"
-        super().__init__(msg)
+        super().__init__(operation, timeout)
+    
+    def __str__(self):
+        parts = ["Operation timed out"]
+        if self.operation:
+            parts.append(f": {self.operation}")
+        if self.timeout:
+            parts.append(f" after {self.timeout} seconds")
+        return "".join(parts)
 
 
 class BuildError(HBDeployError):
@@ -91,12 +107,16 @@ class BuildError(HBDeployError):
     
     def __init__(self, server=None, message=None):
         self.server = server
-        msg = "Build error"
-        if server:
-            msg += f" on {server['name']} ({server['ip']})"
-        if message:
-            msg += f": {message}"
-        super().__init__(msg)
+        self.message = message
+        super().__init__(server, message)
+    
+    def __str__(self):
+        parts = ["Build error"]
+        if self.server:
+            parts.append(f" on {self.server.name} ({self.server.ip})")
+        if self.message:
+            parts.append(f": {self.message}")
+        return "".join(parts)
 
 
 class MaxRetriesExceededError(HBDeployError):
@@ -105,9 +125,25 @@ class MaxRetriesExceededError(HBDeployError):
     def __init__(self, operation=None, max_retries=None):
         self.operation = operation
         self.max_retries = max_retries
-        msg = "Max retries exceeded"
-        if operation:
-            msg += f" for operation: {operation}"
-        if max_retries:
-            msg += f" (max: {max_retries})"
-        super().__init__(msg) 
\ No newline at end of file
+        super().__init__(operation, max_retries)
+    
+    def __str__(self):
+        parts = ["Max retries exceeded"]
+        if self.operation:
+            parts.append(f" for operation: {self.operation}")
+        if self.max_retries:
+            parts.append(f" (max: {self.max_retries})")
+        return "".join(parts)
+
+
+class OperationCancelledError(HBDeployError):
+    """Exception raised when an operation is stopped before it completes."""
+    
+    def __init__(self, operation=None):
+        self.operation = operation
+        super().__init__(operation)
+    
+    def __str__(self):
+        if self.operation:
+            return f"Operation cancelled: {self.operation}"
+        return "Operation cancelled"
@@ -4,6 +4,7 @@ Contains various utility functions used throughout the application.
 """
 
 import random
+import socket
 import string
 import time
 import sys
@@ -12,6 +13,9 @@ from typing import Optional
 
 from src.utils.logger import logger
 
+# Characters used by generate_random_string
+_RANDOM_STRING_CHARS = string.ascii_letters + string.digits
+
 
 def generate_random_string(length: int = 64) -> str:
     """
@@ -23,17 +27,22 @@ def generate_random_string(length: int = 64) -> str:
     Returns:
         str: Random alphanumeric string.
     """
-    chars = string.ascii_letters + string.digits
-    return ''.join(random.choice(chars) for _ in range(length))
+    # Not a secret (it only busts the Docker build cache), so the non-cryptographic
+    # generator is fine; choices() picks all characters in one call
+    return ''.join(random.choices(_RANDOM_STRING_CHARS, k=length))
 
 
 def wait_for_router(router_ip: str, max_retries: int = 30, retry_delay: int = 1) -> bool:
     """
     Wait for router endpoint to become available.
+    Polls with exponential backoff (0.1s doubling up to 2s), so a router that is
+    already up is seen quickly and a slow one isn't polled needlessly often.
+    The polls share one HTTP session, so keep-alive reuses the connection.
     
     Args:
         router_ip (str): IP address of the router.
-        max_retries (int): Maximum number of retry attempts.
+        max_retries (int): Maximum number of retry attempts; together with
+            retry_delay this sets the overall timeout.
         retry_delay (int): Delay between retry attempts (in seconds).
         
     Returns:
@@ -42,19 +51,67 @@ def wait_for_router(router_ip: str, max_retries: int = 30, retry_delay: int = 1)
     endpoint = f"http://{router_ip}:80/~meta@1.0/info/address"
     logger.info(f"Waiting for router at {endpoint}...")
     
-    for i in range(max_retries):
+    deadline = time.monotonic() + max_retries * retry_delay
+    delay = 0.1
+    # Progress dots are only useful on a terminal; redirected output just collects them
+    show_progress = sys.stdout.isatty()
+    
+    # A session per call rather than a shared one, since routers are waited for
+    # from several threads at once
+    with requests.Session() as session:
+        while True:
+            try:
+                response = session.get(endpoint, timeout=2)
+                if response.status_code == 200 and response.text:
+                    logger.info_success("Router is ready!")
+                    return True
+            except requests.exceptions.RequestException:
+                pass
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            time.sleep(min(delay, remaining))
+            # Still use print for progress indicator dots to avoid cluttering logs
+            if show_progress:
+                sys.stdout.write(".")
+                sys.stdout.flush()
+            
+            if delay < 2.0:
+                delay = min(delay * 2, 2.0)
+                logger.debug(f"Router not ready, next check in {delay:g}s")
+    
+    logger.error("Timed out waiting for router")
+    return False
+
+
+def wait_for_port(host: str, port: int, timeout: float = 2) -> bool:
+    """
+    Wait for a TCP port to accept connections.
+    Polls with exponential backoff, returning as soon as a connection succeeds.
+    
+    Args:
+        host (str): Host name or IP address.
+        port (int): TCP port to connect to.
+        timeout (float): Maximum time to wait (in seconds).
+        
+    Returns:
+        bool: True if the port accepted a connection, False if timed out.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    
+    while True:
+        remaining = deadline - time.monotonic()
         try:
-            response = requests.get(endpoint, timeout=2)
-            if response.status_code == 200 and response.text:
-                logger.info_success("Router is ready!")
+            with socket.create_connection((host, port), timeout=max(remaining, 0.1)):
                 return True
-        except requests.exceptions.RequestException:
+        except OSError:
             pass
         
-        time.sleep(retry_delay)
-        # Still use print for progress indicator dots to avoid cluttering logs
-        sys.stdout.write(".")
-        sys.stdout.flush()
-    
-    logger.error("Timed out waiting for router")
-    return False 
\ No newline at end of file
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay *= 2
@@ -0,0 +1,49 @@
+"""
+JSON codec module.
+Provides JSON encoding and decoding that uses orjson when it is installed.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode a JSON document.
+    orjson parses bytes directly, without decoding them to str first.
+    
+    Args:
+        data: The JSON document, as bytes or str
+        
+    Returns:
+        The decoded value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """
+    Encode a value as a JSON string.
+    Values orjson rejects (such as integers beyond 64 bits) are encoded with
+    json instead, so anything json accepts still encodes.
+    
+    Args:
+        obj: The value to encode
+        
+    Returns:
+        str: The JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # orjson.JSONEncodeError is a TypeError
+            pass
+    return json.dumps(obj)
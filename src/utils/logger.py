@@ -5,7 +5,6 @@ Provides a centralized logging system for the application.
 
 import os
 import sys
-import json
 import logging
 import logging.handlers
 import re
@@ -13,7 +12,8 @@ from typing import Dict, Any, Optional
 
 # Remove the direct import of settings
 # from src.config.settings import settings
-from src.ui.colors import Colors
+from src.ui.colors import Colors, COLORS_ENABLED
+from src.utils.json_codec import dumps as _json_dumps
 
 
 # Default configuration values for logging
@@ -31,6 +31,9 @@ DEFAULT_LOG_CONFIG = {
 VERBOSE = 15  # Between DEBUG and INFO
 logging.addLevelName(VERBOSE, "VERBOSE")
 
+# Regex to match ANSI escape sequences
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
 
 class ColoredFormatter(logging.Formatter):
     """Formatter that adds colors to log levels in console output."""
@@ -45,10 +48,8 @@ class ColoredFormatter(logging.Formatter):
     }
     
     def __init__(self, fmt=None, datefmt=None, style='%'):
-        """Initialize with standard format and simplified formats for console output."""
+        """Initialize with simplified formats for console output."""
         super().__init__(fmt, datefmt, style)
-        # Keep the full format for logging to file
-        self.full_fmt = fmt
         # Create a simple format without timestamp and logger name for INFO level
         self.info_fmt = "%(message)s"
         # Create a format with just level name and message for non-INFO levels
@@ -57,39 +58,40 @@ class ColoredFormatter(logging.Formatter):
         # Create formatters
         self.info_formatter = logging.Formatter(self.info_fmt, datefmt, style)
         self.other_formatter = logging.Formatter(self.other_fmt, datefmt, style)
+        
+        # INFO uses the message-only format; other levels fall back to other_formatter
+        self._formatter_by_level = {logging.INFO: self.info_formatter}
+        # Colored level names, built once instead of for every record
+        self._colored_levelnames = {
+            name: f"{color}{name}{Colors.RESET}" for name, color in self.COLORS.items()
+        } if COLORS_ENABLED else {}
     
     def format(self, record):
         """
         Format the log record with simplified output for all levels in console.
         Always strips timestamp and logger name, keeps level name for non-INFO.
         """
-        # Add colors to level name
+        # Add colors to level name, restoring it afterwards for other handlers
         original_levelname = record.levelname
-        if original_levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[original_levelname]}{original_levelname}{Colors.RESET}"
-        
-        # For INFO level, use format with just the message
-        if record.levelno == logging.INFO:
-            return self.info_formatter.format(record)
-        
-        # For other levels, use format with colored level name and message
-        return self.other_formatter.format(record)
+        record.levelname = self._colored_levelnames.get(original_levelname, original_levelname)
+        try:
+            formatter = self._formatter_by_level.get(record.levelno, self.other_formatter)
+            return formatter.format(record)
+        finally:
+            record.levelname = original_levelname
 
 
 class ColorStripper(logging.Formatter):
     """Formatter that strips ANSI color codes from log messages."""
     
-    def __init__(self, fmt=None, datefmt=None, style='%'):
-        super().__init__(fmt, datefmt, style)
-        # Regex to match ANSI escape sequences
-        self.ansi_regex = re.compile(r'\x1b\[[0-9;]*m')
-    
     def format(self, record):
         """Format the record and strip any color codes from the message."""
         # Format the record first
         formatted = super().format(record)
-        # Strip ANSI color codes
-        return self.ansi_regex.sub('', formatted)
+        # Strip ANSI color codes; most records have none, so skip the regex for those
+        if '\x1b' not in formatted:
+            return formatted
+        return _ANSI_RE.sub('', formatted)
 
 
 class StructuredLogRecord(logging.LogRecord):
@@ -104,11 +106,15 @@ class StructuredLogRecord(logging.LogRecord):
         """
         msg = super().getMessage()
         if hasattr(self, 'structured_data') and self.structured_data:
-            try:
-                structured_part = json.dumps(self.structured_data)
-                return f"{msg} {structured_part}"
-            except Exception:
-                return msg
+            # Encode once per record; each handler formats the record again
+            structured_part = self.__dict__.get('_structured_json')
+            if structured_part is None:
+                try:
+                    structured_part = _json_dumps(self.structured_data)
+                except Exception:
+                    return msg
+                self._structured_json = structured_part
+            return f"{msg} {structured_part}"
         return msg
 
 
@@ -139,36 +145,47 @@ class StructuredLogger(logging.Logger):
         if self.isEnabledFor(VERBOSE):
             self._log(VERBOSE, msg, args, **kwargs)
     
-    # Colored logging methods
+    # Color prefixes for the colored logging methods, resolved once
+    _SUCCESS_COLOR = Colors.GREEN
+    _HIGHLIGHT_COLOR = Colors.BOLD
+    _ACTION_COLOR = Colors.BLUE
+    _WARNING_HIGHLIGHT_COLOR = Colors.BOLD + Colors.YELLOW
+    _ERROR_HIGHLIGHT_COLOR = Colors.BOLD + Colors.RED
+    _RESET = Colors.RESET
+    
+    # Colored logging methods. Like verbose(), each checks the level first so no
+    # colored message is built for records that would be discarded.
     def info_success(self, msg, *args, **kwargs):
         """Log a success message with green color"""
-        colored_msg = f"{Colors.GREEN}{msg}{Colors.RESET}"
-        self.info(colored_msg, *args, **kwargs)
+        if self.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, f"{self._SUCCESS_COLOR}{msg}{self._RESET}", args, **kwargs)
     
     def info_highlight(self, msg, *args, **kwargs):
         """Log a highlighted info message with bold formatting"""
-        colored_msg = f"{Colors.BOLD}{msg}{Colors.RESET}"
-        self.info(colored_msg, *args, **kwargs)
+        if self.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, f"{self._HIGHLIGHT_COLOR}{msg}{self._RESET}", args, **kwargs)
     
     def info_action(self, msg, *args, **kwargs):
         """Log an action message with blue color"""
-        colored_msg = f"{Colors.BLUE}{msg}{Colors.RESET}"
-        self.info(colored_msg, *args, **kwargs)
+        if self.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, f"{self._ACTION_COLOR}{msg}{self._RESET}", args, **kwargs)
     
     def warning_highlight(self, msg, *args, **kwargs):
         """Log a warning message with yellow color and bold formatting"""
-        colored_msg = f"{Colors.BOLD}{Colors.YELLOW}{msg}{Colors.RESET}"
-        self.warning(colored_msg, *args, **kwargs)
+        if self.isEnabledFor(logging.WARNING):
+            self._log(logging.WARNING, f"{self._WARNING_HIGHLIGHT_COLOR}{msg}{self._RESET}", args, **kwargs)
     
     def error_highlight(self, msg, *args, **kwargs):
         """Log an error message with red color and bold formatting"""
-        colored_msg = f"{Colors.BOLD}{Colors.RED}{msg}{Colors.RESET}"
-        self.error(colored_msg, *args, **kwargs)
+        if self.isEnabledFor(logging.ERROR):
+            self._log(logging.ERROR, f"{self._ERROR_HIGHLIGHT_COLOR}{msg}{self._RESET}", args, **kwargs)
 
 
 def get_config_value(section, key, default=None):
     """
     Get a configuration value safely without circular imports.
+    Values are read through settings.get_cached, so repeated lookups are memoized
+    and still see changes made through the settings object.
     
     Args:
         section: The configuration section
@@ -183,7 +200,7 @@ def get_config_value(section, key, default=None):
         try:
             # Lazy import to avoid circular dependencies
             from src.config.settings import settings
-            return settings.get(section, key, DEFAULT_LOG_CONFIG[key])
+            return settings.get_cached(section, key, DEFAULT_LOG_CONFIG[key])
         except (ImportError, AttributeError):
             # Fall back to default if settings is not available
             return DEFAULT_LOG_CONFIG.get(key, default)
@@ -191,15 +208,21 @@ def get_config_value(section, key, default=None):
         # For non-logging configs, try to import settings
         try:
             from src.config.settings import settings
-            return settings.get(section, key, default)
+            return settings.get_cached(section, key, default)
         except (ImportError, AttributeError):
             return default
 
 
+def _default_config_value(section, key, default=None):
+    """Get a logging default from DEFAULT_LOG_CONFIG without reading the settings."""
+    return DEFAULT_LOG_CONFIG.get(key, default)
+
+
 def setup_logging(
     name: str = "hb",
     log_level: Optional[str] = None,
-    log_file: Optional[str] = None
+    log_file: Optional[str] = None,
+    use_settings: bool = True
 ) -> StructuredLogger:
     """
     Set up the logging system.
@@ -208,10 +231,14 @@ def setup_logging(
         name: The logger name
         log_level: The log level (overrides settings)
         log_file: The log file path (overrides settings)
+        use_settings: Whether to read the logging section of the settings; if
+            False, only DEFAULT_LOG_CONFIG is used
         
     Returns:
         Logger: The configured logger
     """
+    config_value = get_config_value if use_settings else _default_config_value
+    
     # Register the custom logger class
     logging.setLoggerClass(StructuredLogger)
     
@@ -224,7 +251,7 @@ def setup_logging(
     
     # Get log level from settings if not specified
     if log_level is None:
-        log_level = get_config_value("logging", "level", "INFO")
+        log_level = config_value("logging", "level", "INFO")
     
     # Set the log level
     level = getattr(logging, log_level.upper(), logging.INFO)
@@ -234,34 +261,34 @@ def setup_logging(
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     
-    # Create formatters
-    log_format = get_config_value("logging", "format", 
-                            "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    date_format = get_config_value("logging", "date_format", "%Y-%m-%d %H:%M:%S")
-    
-    # Use colored formatter for console
-    colored_formatter = ColoredFormatter(log_format, date_format)
+    # Use colored formatter for console; its formats don't use the configured
+    # format or date format, which only apply to the log file
+    colored_formatter = ColoredFormatter()
     console_handler.setFormatter(colored_formatter)
     
     # Add console handler to logger
     logger.addHandler(console_handler)
     
     # If a log file is specified or in settings, add a file handler
-    log_file = log_file or get_config_value("logging", "file")
+    log_file = log_file or config_value("logging", "file")
     if log_file:
         log_dir = os.path.dirname(log_file)
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir, exist_ok=True)
         
         # Use a rotating file handler to prevent the log file from growing too large
-        max_size = get_config_value("logging", "max_file_size", 10 * 1024 * 1024)  # 10MB
-        backup_count = get_config_value("logging", "backup_count", 5)
+        max_size = config_value("logging", "max_file_size", 10 * 1024 * 1024)  # 10MB
+        backup_count = config_value("logging", "backup_count", 5)
         
         file_handler = logging.handlers.RotatingFileHandler(
             log_file, maxBytes=max_size, backupCount=backup_count
         )
         file_handler.setLevel(level)
         
+        log_format = config_value("logging", "format", 
+                                  "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        date_format = config_value("logging", "date_format", "%Y-%m-%d %H:%M:%S")
+        
         # Use color stripper formatter for files to remove ANSI color codes
         file_formatter = ColorStripper(log_format, date_format)
         file_handler.setFormatter(file_formatter)
@@ -271,5 +298,7 @@ def setup_logging(
     return logger
 
 
-# Create a default logger
-logger = setup_logging() 
\ No newline at end of file
+# Create a default logger from the built-in defaults. Reading the settings here
+# would load them on import; main() reconfigures the logger from the settings
+# once the command-line arguments are applied.
+logger = setup_logging(use_settings=False) 
\ No newline at end of file